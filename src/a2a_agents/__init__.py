@@ -1,5 +1,8 @@
 """A2A Agent Bootstrapping - Four specialized agents for the A2A protocol."""
 
+from importlib import import_module
+from types import MappingProxyType
+
 # Models for A2A communication
 from .models import (
     CodeAgentRequest,
@@ -17,72 +20,106 @@ from .models import (
     ResearchResult,
     TargetFormat,
     TaskType,
+    code_agent_request_adapter,
 )
 
-# Agent core logic functions
-from .agents.code import process_code_request, code_agent
-from .agents.data_transformation import transform_data, data_transformation_agent
-from .agents.planning import create_plan, planning_agent
-from .agents.research import research_query, research_agent
-
 # Configuration
 from .config import config
 
 __version__ = "0.1.0"
 
-# Agent information
-AGENTS = {
+# Agent core logic functions, imported on first access (see __getattr__) so that
+# importing the package - or a single agent's Modal app - does not load every
+# agent's dependencies.
+_LAZY_IMPORTS = {
+    "process_code_request": ".agents.code",
+    "code_agent": ".agents.code",
+    "transform_data": ".agents.data_transformation",
+    "data_transformation_agent": ".agents.data_transformation",
+    "create_plan": ".agents.planning",
+    "planning_agent": ".agents.planning",
+    "research_query": ".agents.research",
+    "research_agent": ".agents.research",
+}
+
+# Agent information ("agent" and "function" are resolved when AGENTS is first used)
+_AGENT_INFO = {
     "research": {
         "name": "Research Agent",
         "emoji": "🕵️‍♂️",
         "description": "Answers complex queries by searching the web and synthesizing information",
         "modal_app": "apps/research_app.py",
-        "agent": research_agent,
-        "function": research_query,
+        "agent": "research_agent",
+        "function": "research_query",
     },
     "code": {
-        "name": "Code Agent", 
+        "name": "Code Agent",
         "emoji": "💻",
         "description": "Generates new code or reviews code from GitHub repositories",
         "modal_app": "apps/code_app.py",
-        "agent": code_agent,
-        "function": process_code_request,
+        "agent": "code_agent",
+        "function": "process_code_request",
     },
     "data": {
         "name": "Data Transformation Agent",
         "emoji": "🔄",
         "description": "Cleans and structures raw, messy data into specified formats",
         "modal_app": "apps/data_app.py",
-        "agent": data_transformation_agent,
-        "function": transform_data,
+        "agent": "data_transformation_agent",
+        "function": "transform_data",
     },
     "planning": {
         "name": "Logic and Planning Agent",
-        "emoji": "🧠", 
+        "emoji": "🧠",
         "description": "Breaks down high-level goals into logical, sequential plans",
         "modal_app": "apps/planning_app.py",
-        "agent": planning_agent,
-        "function": create_plan,
+        "agent": "planning_agent",
+        "function": "create_plan",
     }
 }
 
-__all__ = [
+
+def __getattr__(name: str):
+    """Import agent objects and the AGENTS registry on first access."""
+    if name in _LAZY_IMPORTS:
+        value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+    elif name == "AGENTS":
+        # Read-only views: the registry is shared module state, built once
+        value = MappingProxyType({
+            key: MappingProxyType({
+                **info,
+                "agent": __getattr__(info["agent"]),
+                "function": __getattr__(info["function"]),
+            })
+            for key, info in _AGENT_INFO.items()
+        })
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+__all__ = (
     # Version
     "__version__",
     # Agent registry
     "AGENTS",
     # Models
     "ResearchQuery", "ResearchResult",
-    "CodeGenerationRequest", "CodeReviewRequest", "CodeAgentRequest", 
+    "CodeGenerationRequest", "CodeReviewRequest", "CodeAgentRequest", "code_agent_request_adapter",
     "CodeGenerationResult", "CodeReviewResult", "CodeAgentResult", "CodeIssue",
     "DataTransformationRequest", "DataTransformationResult", "TargetFormat",
-    "PlanningRequest", "PlanningResult", 
+    "PlanningRequest", "PlanningResult",
     "TaskType",
     # Agent functions
     "research_query", "research_agent",
-    "process_code_request", "code_agent", 
+    "process_code_request", "code_agent",
     "transform_data", "data_transformation_agent",
     "create_plan", "planning_agent",
     # Configuration
     "config",
-]
+)
@@ -1,13 +1,37 @@
 """Core agent implementations."""
 
-from .research import research_agent, research_query
-from .code import code_agent, process_code_request
-from .data_transformation import data_transformation_agent, transform_data
-from .planning import planning_agent, create_plan
+from importlib import import_module
 
-__all__ = [
+# Submodules are imported on first access so that importing one agent does not
+# import the other three and their dependencies.
+_LAZY_IMPORTS = {
+    "research_agent": ".research",
+    "research_query": ".research",
+    "code_agent": ".code",
+    "process_code_request": ".code",
+    "data_transformation_agent": ".data_transformation",
+    "transform_data": ".data_transformation",
+    "planning_agent": ".planning",
+    "create_plan": ".planning",
+}
+
+
+def __getattr__(name: str):
+    """Import agent objects on first access."""
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+__all__ = (
     "research_agent", "research_query",
-    "code_agent", "process_code_request", 
+    "code_agent", "process_code_request",
     "data_transformation_agent", "transform_data",
     "planning_agent", "create_plan",
-]
+)
@@ -1,9 +1,13 @@
 """Code Agent for code generation and GitHub repository review."""
 
+import asyncio
 import os
+import shutil
 import tempfile
-from pathlib import Path
-from typing import List, Union
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
 from urllib.parse import urlparse
 
 from pydantic_ai import Agent, RunContext
@@ -35,6 +39,38 @@ from ..models import (
 )
 
 
+# Maximum number of characters of each code file included in the analysis
+MAX_FILE_CHARS = 5000
+
+# Read size used when counting lines
+_LINE_COUNT_CHUNK = 1 << 16
+
+# Files larger than this (bundles, data dumps, binaries) are left out of the analysis
+MAX_FILE_BYTES = 1024 * 1024
+
+# Dependency, virtualenv and build output directories, which are not the project's code
+SKIPPED_DIRS = frozenset({
+    'node_modules', 'venv', '__pycache__', 'dist', 'build', 'vendor', 'target',
+})
+
+# Generated or lock files that share a code extension or dominate file counts
+SKIPPED_SUFFIXES = ('.min.js', '.min.css', '.map', '.lock')
+
+# Extensions counted as code files in the structure analysis
+CODE_EXTENSIONS = ('.py', '.js', '.ts', '.java', '.cpp', '.c', '.go', '.rs', '.rb')
+
+# Priority extensions for the code content sample
+PRIORITY_EXTENSIONS = ('.py', '.js', '.ts', '.java', '.cpp', '.c', '.go', '.rs')
+
+# Shared pool for the concurrent per-file reads of a repository analysis
+_FILE_IO_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="code-agent-io")
+
+# Repository analyses keyed by (github_url, commit SHA), most recently used last
+MAX_CACHED_ANALYSES = 32
+_ANALYSIS_CACHE: "OrderedDict[tuple, str]" = OrderedDict()
+_ANALYSIS_CACHE_LOCK = threading.Lock()
+
+
 # System prompt for the code agent
 CODE_SYSTEM_PROMPT = """
 You are an expert Code Agent with deep expertise in software development, code generation, and code review.
@@ -78,67 +114,212 @@ When reviewing code, categorize issues by severity:
 """
 
 
-def clone_repository(github_url: str, branch: str = "main") -> str:
+def clone_repository(
+    github_url: str, branch: str = "main", branch_exists: Optional[bool] = None
+) -> str:
     """Clone a GitHub repository to a temporary directory.
     
     Args:
         github_url: The GitHub repository URL
-        branch: Branch to clone (defaults to main)
+        branch: Branch to clone (defaults to main), the default branch is cloned
+            instead when the remote doesn't have it
+        branch_exists: Whether the remote has the branch, if already known
+            (looked up with `git ls-remote` otherwise)
         
     Returns:
         Path to the cloned repository
     """
+    temp_dir = None
     try:
+        git = _import_git()
+        if branch_exists is None:
+            refs = _list_remote_refs(github_url, branch)
+            # If the remote couldn't be queried, let the clone report the error
+            branch_exists = refs is None or f"refs/heads/{branch}" in refs
+        
         # Create a temporary directory
         temp_dir = tempfile.mkdtemp()
         
-        # Clone the repository
-        git = _import_git()
-        repo = git.Repo.clone_from(github_url, temp_dir)
-        
-        # Try to checkout the specified branch
-        try:
-            repo.git.checkout(branch)
-        except git.exc.GitCommandError:
-            # Branch doesn't exist, stay on default branch
+        # Shallow, single-branch clone: the review only needs the current tree
+        shallow = {"depth": 1, "single_branch": True, "no_tags": True}
+        if branch_exists:
+            git.Repo.clone_from(github_url, temp_dir, branch=branch, **shallow)
+        else:
             print(f"Branch '{branch}' not found, using default branch")
+            git.Repo.clone_from(github_url, temp_dir, **shallow)
         
         return temp_dir
     except Exception as e:
+        # Callers only get (and remove) the directory of a successful clone
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
         raise Exception(f"Failed to clone repository: {e}")
 
 
-def analyze_repository_structure(repo_path: str) -> str:
+def _list_remote_refs(github_url: str, branch: str) -> Optional[Dict[str, str]]:
+    """List the remote's SHAs for the branch and HEAD, keyed by ref name.
+    
+    Uses `git ls-remote`, which only exchanges refs with the remote, so it is
+    much cheaper than a clone.
+    
+    Returns:
+        The refs found (the branch is missing if the remote lacks it), or None
+        if the remote couldn't be queried
+    """
+    try:
+        git = _import_git()
+        # "--" so that a URL starting with a dash can't be read as an option
+        output = git.cmd.Git().ls_remote("--", github_url, f"refs/heads/{branch}", "HEAD")
+    except Exception:
+        return None
+    
+    refs = {}
+    for line in output.splitlines():
+        sha, _, ref = line.partition("\t")
+        refs[ref] = sha
+    return refs
+
+
+def _count_lines(path: str) -> Optional[int]:
+    """Count the lines of a file, or return None if it can't be read.
+    
+    Counts newlines over fixed-size binary chunks, so the file is never decoded
+    or held in memory as a whole. A final line without a trailing newline is
+    still counted.
+    """
+    try:
+        lines = 0
+        last = b''
+        with open(path, 'rb') as f:
+            while chunk := f.read(_LINE_COUNT_CHUNK):
+                lines += chunk.count(b'\n')
+                last = chunk
+        if last and not last.endswith(b'\n'):
+            lines += 1
+        return lines
+    except OSError:
+        return None
+
+
+def _read_head(path: str, limit: int = MAX_FILE_CHARS) -> Optional[str]:
+    """Read up to limit + 1 characters of a text file, or None if it can't be read.
+    
+    The extra character lets callers tell whether the file was truncated without
+    reading (and decoding) the rest of it.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read(limit + 1)
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _list_tracked_files(repo_path: str) -> Optional[Dict[str, List[str]]]:
+    """List the files committed at HEAD with `git ls-tree`, grouped by extension.
+    
+    One git process reports every path with its size, so no per-file stat
+    calls are needed. Returns None if repo_path isn't a readable git repository.
+    """
+    try:
+        git = _import_git()
+        output = git.Repo(repo_path).git.ls_tree('-r', '-l', '-z', 'HEAD')
+    except Exception:
+        return None
+    
+    files_by_ext = defaultdict(list)
+    for record in output.split('\0'):
+        if not record:
+            continue
+        info, _, path = record.partition('\t')
+        mode, object_type, _, size = info.split()
+        # Skip submodules and symlinks, like the filesystem walk does
+        if object_type != 'blob' or mode == '120000':
+            continue
+        *dirs, name = path.split('/')
+        if (
+            name.startswith('.')
+            or any(d.startswith('.') or d in SKIPPED_DIRS for d in dirs)
+            or name.lower().endswith(SKIPPED_SUFFIXES)
+            or int(size) > MAX_FILE_BYTES
+        ):
+            continue
+        files_by_ext[os.path.splitext(name)[1].lower()].append(os.path.join(repo_path, path))
+    return files_by_ext
+
+
+def collect_repository_files(repo_path: str) -> Dict[str, List[str]]:
+    """Collect a repository's files once, grouped by lower-cased extension.
+    
+    Hidden files and directories (names starting with '.'), dependency and
+    build output directories (SKIPPED_DIRS), generated files (SKIPPED_SUFFIXES)
+    and files over MAX_FILE_BYTES are skipped before anything is opened.
+    
+    The file list comes from the git index of HEAD when repo_path is a git
+    repository, and from a filesystem walk otherwise.
+    
+    Args:
+        repo_path: Path to the repository
+        
+    Returns:
+        Mapping of extension ('' for none) to file paths, in listing order
+    """
+    files_by_ext = _list_tracked_files(repo_path)
+    if files_by_ext is not None:
+        return files_by_ext
+    
+    files_by_ext = defaultdict(list)
+    # Directories still to visit, popped so the order matches a top-down os.walk
+    pending = [repo_path]
+    while pending:
+        subdirs = []
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if name not in SKIPPED_DIRS:
+                            subdirs.append(entry.path)
+                    elif (
+                        entry.is_file(follow_symlinks=False)
+                        and not name.lower().endswith(SKIPPED_SUFFIXES)
+                        and entry.stat(follow_symlinks=False).st_size <= MAX_FILE_BYTES
+                    ):
+                        files_by_ext[os.path.splitext(name)[1].lower()].append(entry.path)
+        except OSError:
+            continue
+        pending.extend(reversed(subdirs))
+    return files_by_ext
+
+
+def analyze_repository_structure(
+    repo_path: str, files_by_ext: Optional[Dict[str, List[str]]] = None
+) -> str:
     """Analyze the structure and content of a repository.
     
     Args:
         repo_path: Path to the repository
+        files_by_ext: Result of collect_repository_files, to reuse an existing walk
         
     Returns:
         Analysis summary as a string
     """
     try:
-        repo_path = Path(repo_path)
+        if files_by_ext is None:
+            files_by_ext = collect_repository_files(repo_path)
         analysis = []
         
         # Get basic repository info
-        analysis.append(f"Repository structure analysis for: {repo_path.name}")
+        analysis.append(f"Repository structure analysis for: {os.path.basename(repo_path)}")
         analysis.append("=" * 50)
         
         # Count files by extension
-        file_counts = {}
-        total_files = 0
-        code_files = []
+        file_counts = {ext: len(paths) for ext, paths in files_by_ext.items()}
+        total_files = sum(file_counts.values())
         
-        for file_path in repo_path.rglob("*"):
-            if file_path.is_file() and not any(part.startswith('.') for part in file_path.parts):
-                total_files += 1
-                suffix = file_path.suffix.lower()
-                file_counts[suffix] = file_counts.get(suffix, 0) + 1
-                
-                # Collect code files for detailed analysis
-                if suffix in ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.go', '.rs', '.rb']:
-                    code_files.append(file_path)
+        # Collect code files for detailed analysis
+        code_files = [path for ext in CODE_EXTENSIONS for path in files_by_ext.get(ext, ())]
         
         analysis.append(f"Total files: {total_files}")
         analysis.append("File types:")
@@ -146,16 +327,14 @@ def analyze_repository_structure(repo_path: str) -> str:
             if count > 0:
                 analysis.append(f"  {ext or '(no extension)'}: {count}")
         
-        # Analyze key code files (sample up to 10)
+        # Analyze key code files (sample up to 10), reading them concurrently
         analysis.append("\nCode file analysis (sample):")
-        for code_file in code_files[:10]:
-            try:
-                with open(code_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    lines = len(content.splitlines())
-                    analysis.append(f"  {code_file.relative_to(repo_path)}: {lines} lines")
-            except Exception:
-                analysis.append(f"  {code_file.relative_to(repo_path)}: (unable to read)")
+        sample = code_files[:10]
+        for code_file, lines in zip(sample, _FILE_IO_POOL.map(_count_lines, sample), strict=True):
+            if lines is None:
+                analysis.append(f"  {os.path.relpath(code_file, repo_path)}: (unable to read)")
+            else:
+                analysis.append(f"  {os.path.relpath(code_file, repo_path)}: {lines} lines")
         
         if len(code_files) > 10:
             analysis.append(f"  ... and {len(code_files) - 10} more code files")
@@ -165,93 +344,139 @@ def analyze_repository_structure(repo_path: str) -> str:
         return f"Error analyzing repository: {e}"
 
 
-def read_code_files(repo_path: str, max_files: int = 5) -> str:
+def read_code_files(
+    repo_path: str, max_files: int = 5, files_by_ext: Optional[Dict[str, List[str]]] = None
+) -> str:
     """Read the content of key code files for analysis.
     
     Args:
         repo_path: Path to the repository
         max_files: Maximum number of files to read
+        files_by_ext: Result of collect_repository_files, to reuse an existing walk
         
     Returns:
         Combined content of code files
     """
     try:
-        repo_path = Path(repo_path)
+        if files_by_ext is None:
+            files_by_ext = collect_repository_files(repo_path)
         content_parts = []
         
-        # Priority extensions for code analysis
-        priority_extensions = ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.go', '.rs']
-        
-        code_files = []
-        for ext in priority_extensions:
-            files = list(repo_path.rglob(f"*{ext}"))
-            code_files.extend(files[:2])  # Take first 2 of each type
-        
-        # Limit total files
-        code_files = code_files[:max_files]
+        # Take the first 2 files of each priority extension, limited to max_files
+        code_files = [
+            path for ext in PRIORITY_EXTENSIONS for path in files_by_ext.get(ext, [])[:2]
+        ][:max_files]
         
-        for code_file in code_files:
-            try:
-                with open(code_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    # Limit content size to avoid overwhelming the LLM
-                    if len(content) > 5000:
-                        content = content[:5000] + "\n... (truncated)"
-                    
-                    content_parts.append(f"""
-File: {code_file.relative_to(repo_path)}
+        # Read only the head of each file, concurrently
+        for code_file, content in zip(
+            code_files, _FILE_IO_POOL.map(_read_head, code_files), strict=True
+        ):
+            if content is None:
+                content_parts.append(f"File: {os.path.relpath(code_file, repo_path)} - (unable to read)")
+                continue
+            
+            # Limit content size to avoid overwhelming the LLM
+            if len(content) > MAX_FILE_CHARS:
+                content = content[:MAX_FILE_CHARS] + "\n... (truncated)"
+            
+            content_parts.append(f"""
+File: {os.path.relpath(code_file, repo_path)}
 {'=' * 40}
 {content}
 {'=' * 40}
 """)
-            except Exception:
-                content_parts.append(f"File: {code_file.relative_to(repo_path)} - (unable to read)")
         
         return "\n".join(content_parts) if content_parts else "No code files found or readable."
     except Exception as e:
         return f"Error reading code files: {e}"
 
 
-# Create the code agent
-code_agent = Agent(
-    model=MODEL_NAME,
-    name="Code Agent",
-    system_prompt=CODE_SYSTEM_PROMPT,
-    deps_type=RunContext,
-)
-
-
-@code_agent.tool
-async def analyze_github_repository(ctx: RunContext, github_url: str, branch: str = "main") -> str:
-    """Clone and analyze a GitHub repository.
+def analyze_repository(github_url: str, branch: str = "main") -> str:
+    """Clone a repository and build the analysis text for the agent.
+    
+    This does blocking git and filesystem I/O, so async callers should run it
+    in a worker thread.
     
     Args:
-        ctx: The run context
         github_url: GitHub repository URL
         branch: Branch to analyze
         
     Returns:
         Repository analysis results
     """
+    repo_path = None
     try:
-        # Clone the repository
-        repo_path = clone_repository(github_url, branch)
+        # Reuse the analysis of a commit we've already seen: the branch's commit,
+        # or the remote HEAD when it lacks the branch (what the clone checks out)
+        refs = _list_remote_refs(github_url, branch)
+        branch_ref = f"refs/heads/{branch}"
+        commit_sha = None if refs is None else refs.get(branch_ref) or refs.get("HEAD")
+        cache_key = (github_url, commit_sha)
+        if commit_sha is not None:
+            with _ANALYSIS_CACHE_LOCK:
+                if cache_key in _ANALYSIS_CACHE:
+                    _ANALYSIS_CACHE.move_to_end(cache_key)
+                    return _ANALYSIS_CACHE[cache_key]
+        
+        # Clone the repository, falling back to the default branch only when the
+        # remote is known not to have the requested one
+        repo_path = clone_repository(
+            github_url, branch, branch_exists=refs is None or branch_ref in refs
+        )
+        
+        # Walk the repository once and share the result
+        files_by_ext = collect_repository_files(repo_path)
         
         # Get repository structure
-        structure_analysis = analyze_repository_structure(repo_path)
+        structure_analysis = analyze_repository_structure(repo_path, files_by_ext=files_by_ext)
         
         # Read key code files
-        code_content = read_code_files(repo_path)
+        code_content = read_code_files(repo_path, files_by_ext=files_by_ext)
         
-        return f"""
+        result = f"""
 Repository Analysis:
 {structure_analysis}
 
 Key Code Files Content:
 {code_content}
 """
+        if commit_sha is not None:
+            with _ANALYSIS_CACHE_LOCK:
+                _ANALYSIS_CACHE[cache_key] = result
+                while len(_ANALYSIS_CACHE) > MAX_CACHED_ANALYSES:
+                    _ANALYSIS_CACHE.popitem(last=False)
+        return result
     except Exception as e:
         return f"Error analyzing repository: {e}"
+    finally:
+        # The clone is only needed while building the analysis
+        if repo_path is not None:
+            shutil.rmtree(repo_path, ignore_errors=True)
+
+
+# Create the code agent
+code_agent = Agent(
+    model=MODEL_NAME,
+    name="Code Agent",
+    system_prompt=CODE_SYSTEM_PROMPT,
+    deps_type=RunContext,
+)
+
+
+@code_agent.tool
+async def analyze_github_repository(ctx: RunContext, github_url: str, branch: str = "main") -> str:
+    """Clone and analyze a GitHub repository.
+    
+    Args:
+        ctx: The run context
+        github_url: GitHub repository URL
+        branch: Branch to analyze
+        
+    Returns:
+        Repository analysis results
+    """
+    # Cloning and walking the repository blocks, keep it off the event loop
+    return await asyncio.to_thread(analyze_repository, github_url, branch)
 
 
 async def process_code_request(request: CodeAgentRequest) -> CodeAgentResult:
@@ -263,12 +488,10 @@ async def process_code_request(request: CodeAgentRequest) -> CodeAgentResult:
     Returns:
         Code agent result (generation or review)
     """
-    if isinstance(request, CodeGenerationRequest):
-        return await generate_code(request)
-    elif isinstance(request, CodeReviewRequest):
-        return await review_code(request)
-    else:
+    handler = _REQUEST_HANDLERS.get(type(request))
+    if handler is None:
         raise ValueError(f"Unknown request type: {type(request)}")
+    return await handler(request)
 
 
 async def generate_code(request: CodeGenerationRequest) -> CodeGenerationResult:
@@ -310,7 +533,7 @@ async def review_code(request: CodeReviewRequest) -> CodeReviewResult:
     Returns:
         Code review result with summary and issues
     """
-    github_url = str(request.github_url)
+    github_url = request.github_url
     branch = request.branch or "main"
     
     result = await code_agent.run(
@@ -348,5 +571,12 @@ Please be thorough in your analysis and provide actionable feedback."""
     )
 
 
+# Handler for each code agent request type
+_REQUEST_HANDLERS = {
+    CodeGenerationRequest: generate_code,
+    CodeReviewRequest: review_code,
+}
+
+
 # Export the main functions
 __all__ = ['process_code_request', 'generate_code', 'review_code', 'code_agent']
@@ -1,13 +1,20 @@
 """Data Transformation Agent for cleaning and structuring messy data."""
 
+import asyncio
 import csv
 import json
+import math
 import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from functools import lru_cache
+from html import escape
 from io import StringIO
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urlparse
 
 import httpx
+import orjson
 import yaml
 from pydantic_ai import Agent, RunContext
 
@@ -56,15 +63,47 @@ Format-specific guidelines:
 """
 
 
+# Longest input still treated as a URL to fetch rather than as data
+MAX_URL_LENGTH = 2048
+
+
 def is_url(text: str) -> bool:
-    """Check if the given text is a valid URL."""
+    """Check if the given text is a valid http(s) URL.
+    
+    Cheap length and prefix checks run first, so ordinary data payloads (which
+    can be megabytes long) are rejected without being parsed.
+    """
+    if len(text) > MAX_URL_LENGTH:
+        return False
+    text = text.strip()
+    if not text[:8].lower().startswith(('http://', 'https://')) or '\n' in text:
+        return False
     try:
-        result = urlparse(text)
-        return all([result.scheme, result.netloc])
+        return bool(urlparse(text).netloc)
     except Exception:
         return False
 
 
+# Largest response body fetch_data_from_url accepts
+MAX_FETCH_BYTES = 10 * 1024 * 1024
+
+# Shared HTTP client, so repeated fetches reuse pooled keep-alive connections
+# instead of paying DNS + TCP + TLS setup on every call. Created on first use
+# so it binds to the event loop that is serving requests.
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        )
+    return _http_client
+
+
 async def fetch_data_from_url(url: str) -> str:
     """Fetch data from a URL.
     
@@ -75,60 +114,123 @@ async def fetch_data_from_url(url: str) -> str:
         The fetched data as a string
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=10.0)
+        # Stream the body so an oversized response is rejected at MAX_FETCH_BYTES
+        # instead of being loaded into memory whole
+        async with _get_http_client().stream("GET", url) as response:
             response.raise_for_status()
-            return response.text
+            if int(response.headers.get("content-length") or 0) > MAX_FETCH_BYTES:
+                raise ValueError(f"response is larger than {MAX_FETCH_BYTES} bytes")
+            
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) > MAX_FETCH_BYTES:
+                    raise ValueError(f"response is larger than {MAX_FETCH_BYTES} bytes")
+            return body.decode(response.encoding or "utf-8", errors="replace")
     except Exception as e:
         raise Exception(f"Failed to fetch data from URL: {e}")
 
 
-def detect_data_format(data: str) -> str:
-    """Detect the format of the input data.
+# Dicts nested deeper than this are replaced by a placeholder, which keeps the
+# recursive renderers well clear of the recursion limit (and ends cycles from
+# self-referencing YAML aliases)
+MAX_NESTING_DEPTH = 64
+_TOO_DEEP = "... (nested too deeply)"
+
+# Characters not allowed in the XML tags built from data keys
+_XML_TAG_RE = re.compile(r'[^a-zA-Z0-9_]')
+
+# libyaml-backed loader/dumper when PyYAML was built with it; the pure-Python
+# ones are one to two orders of magnitude slower
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# First content line (after any comments and %YAML/%TAG directives) of a
+# plausible YAML document
+_YAML_HINT_RE = re.compile(r'(?:[#%][^\n]*\n\s*)*(?:---|-\s|[^\s:#<{\[][^\n:]*:(?:\s|$))')
+
+# Largest payload whose detection and parse results are cached
+MAX_CACHED_DATA_CHARS = 64 * 1024
+
+# Integer literals this long may not fit in 64 bits, which orjson would read as
+# lossy floats (json.loads keeps them exact)
+_WIDE_INT_RE = re.compile(r'\d{19,}')
+
+# Marks formats whose detection doesn't produce a parsed value
+_UNPARSED = object()
+
+
+def _detect_and_parse(data: str) -> Tuple[str, Any]:
+    """Detect the format of the input data, keeping any value parsed on the way.
+    
+    JSON and YAML can only be recognised by parsing them, so the parsed value is
+    returned alongside the format to spare callers a second parse.
     
     Args:
         data: The input data string
         
     Returns:
-        Detected format as a string
+        Tuple of (detected format, parsed value or _UNPARSED)
     """
     # Remove leading/trailing whitespace
     data = data.strip()
     
-    # Check for JSON
+    # Check for JSON (orjson is a C parser, much faster than json.loads)
     if (data.startswith('{') and data.endswith('}')) or (data.startswith('[') and data.endswith(']')):
         try:
-            json.loads(data)
-            return "JSON"
-        except json.JSONDecodeError:
+            if _WIDE_INT_RE.search(data) is None:
+                return "JSON", orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+        # Wide integers, and the NaN/Infinity literals and out of range numbers
+        # orjson rejects, are left to json.loads
+        try:
+            return "JSON", json.loads(data)
+        except (ValueError, RecursionError):
             pass
     
     # Check for XML
     if data.startswith('<') and data.endswith('>'):
-        return "XML"
+        return "XML", _UNPARSED
     
-    # Check for YAML
-    if ':' in data and not data.startswith('<'):
+    # Check for YAML, only when the first content line looks like a mapping key,
+    # list item or document marker (plain text with a URL or a colon doesn't),
+    # or opens a flow collection that wasn't valid JSON ({a: 1}, {'a': 1})
+    if ':' in data and (data.startswith(('{', '[')) or _YAML_HINT_RE.match(data)):
         try:
-            yaml.safe_load(data)
-            return "YAML"
+            return "YAML", yaml.load(data, Loader=_YAML_LOADER)
         except yaml.YAMLError:
             pass
     
-    # Check for CSV (simple heuristic)
+    # Check for CSV (simple heuristic on the first two lines only)
     if ',' in data and '\n' in data:
-        lines = data.split('\n')
+        lines = data.split('\n', 2)
         if len(lines) > 1:
             first_line_commas = lines[0].count(',')
             second_line_commas = lines[1].count(',')
             if first_line_commas > 0 and abs(first_line_commas - second_line_commas) <= 1:
-                return "CSV"
+                return "CSV", _UNPARSED
     
     # Check for TSV
     if '\t' in data and '\n' in data:
-        return "TSV"
+        return "TSV", _UNPARSED
+    
+    return "Unstructured Text", _UNPARSED
+
+
+def detect_data_format(data: str) -> str:
+    """Detect the format of the input data.
     
-    return "Unstructured Text"
+    Args:
+        data: The input data string
+        
+    Returns:
+        Detected format as a string
+    """
+    if len(data) <= MAX_CACHED_DATA_CHARS:
+        # Payloads usually go on to be parsed too, so share the cached parse
+        return _clean_and_parse(data)[0]
+    return _detect_and_parse(data)[0]
 
 
 def clean_and_parse_data(data: str) -> Dict[str, Any]:
@@ -140,14 +242,47 @@ def clean_and_parse_data(data: str) -> Dict[str, Any]:
     Returns:
         Parsed and cleaned data structure
     """
-    detected_format = detect_data_format(data)
+    # Parsed afresh rather than taken from the cache: callers may modify the
+    # result, and a fresh parse is cheaper than a deep copy of a cached one
+    return _clean_and_parse_uncached(data)[1]
+
+
+def _clean_and_parse(data: str) -> Tuple[str, Any]:
+    """Detect the format of the input data and parse it, in a single pass.
     
-    try:
-        if detected_format == "JSON":
-            return json.loads(data)
+    Results for payloads up to MAX_CACHED_DATA_CHARS are cached, as the same
+    data often goes through several tool calls. The cached structures are
+    shared between callers and must not be modified (clean_and_parse_data
+    parses afresh for callers that do).
+    
+    Args:
+        data: Raw input data
         
-        elif detected_format == "YAML":
-            return yaml.safe_load(data)
+    Returns:
+        Tuple of (detected format, parsed and cleaned data structure)
+    """
+    if len(data) <= MAX_CACHED_DATA_CHARS:
+        return _clean_and_parse_cached(data)
+    return _clean_and_parse_uncached(data)
+
+
+def _clean_and_parse_uncached(data: str) -> Tuple[str, Any]:
+    """Uncached implementation of _clean_and_parse."""
+    detected_format, parsed = _detect_and_parse(data)
+    return detected_format, _parse_detected(data, detected_format, parsed)
+
+
+# Keyed on the data itself, so only small payloads are cached (at most
+# 128 x 64K characters held)
+_clean_and_parse_cached = lru_cache(maxsize=128)(_clean_and_parse_uncached)
+
+
+def _parse_detected(data: str, detected_format: str, parsed: Any) -> Any:
+    """Build the parsed data structure for an already detected format."""
+    try:
+        if parsed is not _UNPARSED:
+            # JSON and YAML were already parsed during detection
+            return parsed
         
         elif detected_format == "CSV":
             # Parse CSV data
@@ -177,9 +312,44 @@ def clean_and_parse_data(data: str) -> Dict[str, Any]:
         }
 
 
+def _has_non_finite_float(data: Any) -> bool:
+    """Check whether data contains a NaN or infinite float, at any depth."""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+    return False
+
+
 def transform_to_json(data: Dict[str, Any]) -> str:
     """Transform data to JSON format."""
-    return json.dumps(data, indent=2, ensure_ascii=False)
+    try:
+        # orjson's C serializer keeps its fast path with indentation, unlike json.dumps
+        result = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    except orjson.JSONEncodeError:
+        # e.g. integers wider than 64 bits, which only the stdlib encoder handles
+        return json.dumps(data, indent=2, ensure_ascii=False)
+    # orjson writes NaN and infinities as null, json.dumps keeps them (only
+    # output containing null needs checking)
+    if b"null" in result and _has_non_finite_float(data):
+        return json.dumps(data, indent=2, ensure_ascii=False)
+    return result.decode("utf-8")
+
+
+def _flatten_first_level(data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yield one CSV row per top-level value, one per item for list values."""
+    for key, value in data.items():
+        if isinstance(value, list):
+            for i, item in enumerate(value):
+                yield {"key": key, "index": i, "value": str(item)}
+        else:
+            yield {"key": key, "value": str(value)}
 
 
 def transform_to_csv(data: Dict[str, Any]) -> str:
@@ -195,113 +365,169 @@ def transform_to_csv(data: Dict[str, Any]) -> str:
             # Simple flat dict
             tabular_data = [data]
         else:
-            # Complex dict - flatten first level
-            flattened = []
-            for key, value in data.items():
-                if isinstance(value, list):
-                    for i, item in enumerate(value):
-                        flattened.append({"key": key, "index": i, "value": str(item)})
-                else:
-                    flattened.append({"key": key, "value": str(value)})
-            tabular_data = flattened
+            # Complex dict - flatten first level, lazily
+            tabular_data = _flatten_first_level(data)
     else:
         tabular_data = [{"value": str(data)}]
     
-    if not tabular_data:
+    # Rows are written in a single pass; the header comes from the first row
+    rows = iter(tabular_data)
+    first_row = next(rows, None)
+    if first_row is None:
         return "No data to convert to CSV"
     
     # Create CSV
-    output = StringIO()
-    fieldnames = list(tabular_data[0].keys()) if tabular_data else []
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
+    output = StringIO(newline='')
+    writer = csv.DictWriter(output, fieldnames=list(first_row.keys()))
     writer.writeheader()
-    writer.writerows(tabular_data)
+    writer.writerow(first_row)
+    writer.writerows(rows)
     
     return output.getvalue()
 
 
+@lru_cache(maxsize=4096)
+def _clean_xml_tag(key: str) -> str:
+    """Turn a data key into an XML tag name; keys repeat across rows, so cache it."""
+    return _XML_TAG_RE.sub('_', key)
+
+
 def transform_to_xml(data: Dict[str, Any]) -> str:
     """Transform data to XML format."""
-    def dict_to_xml(d: Dict[str, Any], root_tag: str = "data") -> str:
-        xml_parts = [f"<{root_tag}>"]
+    def build_xml(parent: ET.Element, d: Dict[str, Any], depth: int = 1) -> None:
+        if depth > MAX_NESTING_DEPTH:
+            parent.text = _TOO_DEEP
+            return
         
         for key, value in d.items():
             # Clean key for XML tag
-            clean_key = re.sub(r'[^a-zA-Z0-9_]', '_', str(key))
+            clean_key = _clean_xml_tag(str(key))
             
             if isinstance(value, dict):
-                xml_parts.append(dict_to_xml(value, clean_key))
+                build_xml(ET.SubElement(parent, clean_key), value, depth + 1)
             elif isinstance(value, list):
                 for item in value:
                     if isinstance(item, dict):
-                        xml_parts.append(dict_to_xml(item, clean_key))
+                        build_xml(ET.SubElement(parent, clean_key), item, depth + 1)
                     else:
-                        xml_parts.append(f"<{clean_key}>{str(item)}</{clean_key}>")
+                        ET.SubElement(parent, clean_key).text = str(item)
             else:
-                xml_parts.append(f"<{clean_key}>{str(value)}</{clean_key}>")
-        
-        xml_parts.append(f"</{root_tag}>")
-        return "\n".join(xml_parts)
+                ET.SubElement(parent, clean_key).text = str(value)
     
-    return f'<?xml version="1.0" encoding="UTF-8"?>\n{dict_to_xml(data)}'
+    # ElementTree escapes text and serializes the whole tree in one pass
+    root = ET.Element("data")
+    build_xml(root, data)
+    ET.indent(root)
+    return f'<?xml version="1.0" encoding="UTF-8"?>\n{ET.tostring(root, encoding="unicode")}'
 
 
 def transform_to_yaml(data: Dict[str, Any]) -> str:
     """Transform data to YAML format."""
-    return yaml.dump(data, default_flow_style=False, allow_unicode=True)
+    return yaml.dump(data, Dumper=_YAML_DUMPER, default_flow_style=False, allow_unicode=True)
 
 
 def transform_to_markdown(data: Dict[str, Any]) -> str:
     """Transform data to Markdown format."""
-    def dict_to_markdown(d: Dict[str, Any], level: int = 1) -> str:
-        md_parts = []
+    # All fragments go into one list that is joined once at the end
+    md_parts: List[str] = []
+    # Fragments of already rendered dicts by (id, level), for subtrees that
+    # appear several times (e.g. YAML aliases)
+    rendered: Dict[Tuple[int, int], List[str]] = {}
+    truncations = 0
+    
+    def dict_to_markdown(d: Dict[str, Any], level: int = 1, depth: int = 1) -> None:
+        nonlocal truncations
+        if depth > MAX_NESTING_DEPTH:
+            truncations += 1
+            md_parts.append(f"{_TOO_DEEP}\n")
+            return
+        
+        cache_key = (id(d), level)
+        if cache_key in rendered:
+            md_parts.extend(rendered[cache_key])
+            return
+        start, truncations_before = len(md_parts), truncations
         
+        if not d:
+            md_parts.append("")
+        
+        # Headings stop at level 6, so deeper levels all render the same
+        child_level = min(level + 1, 6)
         for key, value in d.items():
-            header = "#" * min(level, 6)
-            md_parts.append(f"{header} {key}\n")
+            md_parts.append(f"{'#' * level} {key}\n")
             
             if isinstance(value, dict):
-                md_parts.append(dict_to_markdown(value, level + 1))
+                dict_to_markdown(value, child_level, depth + 1)
             elif isinstance(value, list):
                 for item in value:
                     if isinstance(item, dict):
-                        md_parts.append(dict_to_markdown(item, level + 1))
+                        dict_to_markdown(item, child_level, depth + 1)
                     else:
                         md_parts.append(f"- {str(item)}")
                 md_parts.append("")
             else:
                 md_parts.append(f"{str(value)}\n")
         
-        return "\n".join(md_parts)
+        # A fragment cut off by the depth limit depends on where it was rendered
+        if truncations == truncations_before:
+            rendered[cache_key] = md_parts[start:]
     
-    return dict_to_markdown(data)
+    dict_to_markdown(data)
+    return "\n".join(md_parts)
 
 
 def transform_to_html(data: Dict[str, Any]) -> str:
     """Transform data to HTML format."""
-    def dict_to_html(d: Dict[str, Any], level: int = 1) -> str:
-        html_parts = []
+    # All fragments go into one list that is joined once at the end
+    html_parts: List[str] = []
+    # Fragments of already rendered dicts by (id, level), for subtrees that
+    # appear several times (e.g. YAML aliases)
+    rendered: Dict[Tuple[int, int], List[str]] = {}
+    truncations = 0
+    
+    def dict_to_html(d: Dict[str, Any], level: int = 1, depth: int = 1) -> None:
+        nonlocal truncations
+        if depth > MAX_NESTING_DEPTH:
+            truncations += 1
+            html_parts.append(f"<p>{_TOO_DEEP}</p>")
+            return
+        
+        cache_key = (id(d), level)
+        if cache_key in rendered:
+            html_parts.extend(rendered[cache_key])
+            return
+        start, truncations_before = len(html_parts), truncations
+        
+        if not d:
+            html_parts.append("")
         
+        # Headings stop at h6, so deeper levels all render the same
+        header_tag = f"h{level}"
+        child_level = min(level + 1, 6)
         for key, value in d.items():
-            header_tag = f"h{min(level, 6)}"
-            html_parts.append(f"<{header_tag}>{str(key)}</{header_tag}>")
+            html_parts.append(f"<{header_tag}>{escape(str(key))}</{header_tag}>")
             
             if isinstance(value, dict):
-                html_parts.append(dict_to_html(value, level + 1))
+                dict_to_html(value, child_level, depth + 1)
             elif isinstance(value, list):
                 html_parts.append("<ul>")
                 for item in value:
                     if isinstance(item, dict):
                         html_parts.append("<li>")
-                        html_parts.append(dict_to_html(item, level + 1))
+                        dict_to_html(item, child_level, depth + 1)
                         html_parts.append("</li>")
                     else:
-                        html_parts.append(f"<li>{str(item)}</li>")
+                        html_parts.append(f"<li>{escape(str(item))}</li>")
                 html_parts.append("</ul>")
             else:
-                html_parts.append(f"<p>{str(value)}</p>")
+                html_parts.append(f"<p>{escape(str(value))}</p>")
         
-        return "\n".join(html_parts)
+        # A fragment cut off by the depth limit depends on where it was rendered
+        if truncations == truncations_before:
+            rendered[cache_key] = html_parts[start:]
+    
+    dict_to_html(data)
+    body = "\n".join(html_parts)
     
     return f"""<!DOCTYPE html>
 <html>
@@ -310,22 +536,41 @@ def transform_to_html(data: Dict[str, Any]) -> str:
     <title>Transformed Data</title>
 </head>
 <body>
-{dict_to_html(data)}
+{body}
 </body>
 </html>"""
 
 
+# Transformation function for each target format
+_TRANSFORMERS = {
+    TargetFormat.JSON: transform_to_json,
+    TargetFormat.CSV: transform_to_csv,
+    TargetFormat.XML: transform_to_xml,
+    TargetFormat.YAML: transform_to_yaml,
+    TargetFormat.MARKDOWN: transform_to_markdown,
+    TargetFormat.HTML: transform_to_html,
+}
+
+
+@dataclass
+class DataTransformationDeps:
+    """Input data parsed once by transform_data and shared with the agent's tools."""
+    raw_data: str
+    detected_format: str
+    parsed_data: Any
+
+
 # Create the data transformation agent
 data_transformation_agent = Agent(
     model=MODEL_NAME,
     name="Data Agent",
     system_prompt=DATA_TRANSFORMATION_SYSTEM_PROMPT,
-    deps_type=RunContext,
+    deps_type=DataTransformationDeps,
 )
 
 
 @data_transformation_agent.tool
-async def analyze_and_clean_data(ctx: RunContext, raw_data: str) -> str:
+async def analyze_and_clean_data(ctx: RunContext[DataTransformationDeps], raw_data: str) -> str:
     """Analyze and clean the input data.
     
     Args:
@@ -335,8 +580,13 @@ async def analyze_and_clean_data(ctx: RunContext, raw_data: str) -> str:
     Returns:
         Analysis and cleaning recommendations
     """
-    detected_format = detect_data_format(raw_data)
-    parsed_data = clean_and_parse_data(raw_data)
+    deps = ctx.deps
+    if deps is not None and deps.raw_data == raw_data:
+        # transform_data has already parsed this data
+        detected_format, parsed_data = deps.detected_format, deps.parsed_data
+    else:
+        # Parsing large payloads (YAML especially) is slow, keep it off the event loop
+        detected_format, parsed_data = await asyncio.to_thread(_clean_and_parse, raw_data)
     
     return f"""
 Data Analysis Results:
@@ -360,12 +610,18 @@ async def transform_data(request: DataTransformationRequest) -> DataTransformati
     # Check if data is a URL
     if is_url(raw_data):
         try:
-            raw_data = await fetch_data_from_url(raw_data)
+            raw_data = await fetch_data_from_url(raw_data.strip())
         except Exception as e:
             return DataTransformationResult(
                 transformed_data=f"Error fetching data from URL: {e}"
             )
     
+    # Parse and clean the data once, for both the agent's tool and our transformation
+    detected_format, parsed_data = await asyncio.to_thread(_clean_and_parse, raw_data)
+    deps = DataTransformationDeps(
+        raw_data=raw_data, detected_format=detected_format, parsed_data=parsed_data
+    )
+    
     # Let the AI agent analyze and suggest improvements
     result = await data_transformation_agent.run(
         f"""Please analyze and transform the following data to {request.target_format.value.upper()} format:
@@ -381,26 +637,15 @@ Please:
 3. Transform it to the target format with proper structure
 4. Ensure the output is valid and well-formatted
 
-Provide only the transformed data as your final response."""
+Provide only the transformed data as your final response.""",
+        deps=deps,
     )
     
-    # Parse and clean the data
-    parsed_data = clean_and_parse_data(raw_data)
-    
     # Transform to the target format
     try:
-        if request.target_format == TargetFormat.JSON:
-            transformed = transform_to_json(parsed_data)
-        elif request.target_format == TargetFormat.CSV:
-            transformed = transform_to_csv(parsed_data)
-        elif request.target_format == TargetFormat.XML:
-            transformed = transform_to_xml(parsed_data)
-        elif request.target_format == TargetFormat.YAML:
-            transformed = transform_to_yaml(parsed_data)
-        elif request.target_format == TargetFormat.MARKDOWN:
-            transformed = transform_to_markdown(parsed_data)
-        elif request.target_format == TargetFormat.HTML:
-            transformed = transform_to_html(parsed_data)
+        transformer = _TRANSFORMERS.get(request.target_format)
+        if transformer is not None:
+            transformed = transformer(parsed_data)
         else:
             transformed = f"Unsupported target format: {request.target_format}"
     except Exception as e:
@@ -1,11 +1,16 @@
 """Logic and Planning Agent for breaking down high-level goals into actionable steps."""
 
 import re
-from typing import List
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from io import StringIO
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from pydantic_ai import Agent, RunContext
 
-from ..config import MODEL_NAME
+from ..config import MODEL_NAME, config
 from ..models import PlanningRequest, PlanningResult
 
 
@@ -58,21 +63,78 @@ Types of goals you excel at planning:
 - Event planning and project management
 """
 
+# Most steps taken from the AI's plan, for manageable output
+MAX_PLAN_STEPS = 20
 
-def analyze_goal_complexity(goal: str) -> str:
+# Numbered ("1. ...") and bulleted ("- ...") list items in the AI's plan, in one
+# pattern so each line is matched once
+_LIST_ITEM_RE = re.compile(r'^(?:\d+\.|[-*•])\s*(.+)$')
+
+# Leading numbering and bullets left on a step. The ASCII characters are
+# stripped with str.lstrip; the regex only handles the rare non-ASCII digit or
+# whitespace left after that.
+_LEADING_BULLET_CHARS = '0123456789.-*• \t\n\r\f\v'
+_LEADING_BULLET_RE = re.compile(r'^[\d\.\-\*•\s]+')
+
+# Text between sentence-ending punctuation, for plans without list items
+_SENTENCE_RE = re.compile(r'[^.!?]+')
+
+# Verbs an unlisted line can start with to count as a new step (matched as
+# prefixes, so "deploying" counts as "deploy")
+ACTION_VERBS = (
+    'create', 'develop', 'build', 'design', 'implement', 'test', 'deploy',
+    'analyze', 'research', 'study', 'plan', 'organize', 'prepare',
+    'write', 'document', 'review', 'validate', 'verify', 'establish',
+    'configure', 'install', 'setup', 'initialize', 'launch', 'publish',
+    'gather', 'collect', 'identify', 'define', 'specify', 'determine'
+)
+
+# Keywords marking a goal as belonging to each category (matched anywhere in the
+# goal, so "app" also matches "apply")
+GOAL_CATEGORY_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "technical": ("develop", "build", "code", "implement", "deploy", "system", "software", "app"),
+    "business": ("launch", "market", "revenue", "customer", "business", "strategy", "sales"),
+    "research": ("research", "analyze", "study", "investigate", "explore", "understand"),
+    "learning": ("learn", "master", "improve", "skill", "knowledge", "education", "training"),
+    "creative": ("design", "create", "write", "produce", "craft", "artistic", "creative"),
+    "process": ("improve", "optimize", "streamline", "process", "workflow", "efficiency"),
+}
+
+# Keywords marking a goal as time sensitive
+TIME_KEYWORDS = ("urgent", "asap", "quickly", "immediately", "long-term", "future", "eventually")
+
+# Categories of each distinct keyword (time keywords have none)
+_KEYWORD_CATEGORIES: Dict[str, List[str]] = {keyword: [] for keyword in TIME_KEYWORDS}
+for _category, _keywords in GOAL_CATEGORY_KEYWORDS.items():
+    for _keyword in _keywords:
+        _KEYWORD_CATEGORIES.setdefault(_keyword, []).append(_category)
+
+# Steps of recently planned goals, so a repeated goal doesn't need another LLM call
+MAX_CACHED_PLANS = 128
+_PLAN_CACHE: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+_PLAN_CACHE_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class GoalAnalysis:
+    """Characteristics of a goal, as found by analyze_goal."""
+    word_count: int
+    complexity: str
+    categories: Tuple[str, ...]
+    time_sensitive: bool
+
+
+def analyze_goal(goal: str) -> GoalAnalysis:
     """Analyze the complexity and characteristics of a goal.
     
     Args:
         goal: The goal string to analyze
         
     Returns:
-        Analysis summary as a string
+        The goal's analysis
     """
-    analysis_points = []
-    
     # Basic length and complexity indicators
     word_count = len(goal.split())
-    analysis_points.append(f"Word count: {word_count}")
     
     if word_count < 10:
         complexity = "Simple"
@@ -81,88 +143,83 @@ def analyze_goal_complexity(goal: str) -> str:
     else:
         complexity = "Complex"
     
-    analysis_points.append(f"Complexity level: {complexity}")
-    
-    # Look for key indicators
-    indicators = {
-        "technical": ["develop", "build", "code", "implement", "deploy", "system", "software", "app"],
-        "business": ["launch", "market", "revenue", "customer", "business", "strategy", "sales"],
-        "research": ["research", "analyze", "study", "investigate", "explore", "understand"],
-        "learning": ["learn", "master", "improve", "skill", "knowledge", "education", "training"],
-        "creative": ["design", "create", "write", "produce", "craft", "artistic", "creative"],
-        "process": ["improve", "optimize", "streamline", "process", "workflow", "efficiency"]
+    # Look for key indicators, searching for each distinct keyword once
+    goal_lower = goal.lower()
+    found_keywords = {keyword for keyword in _KEYWORD_CATEGORIES if keyword in goal_lower}
+    found_categories = {
+        category for keyword in found_keywords for category in _KEYWORD_CATEGORIES[keyword]
     }
     
-    detected_categories = []
-    goal_lower = goal.lower()
+    return GoalAnalysis(
+        word_count=word_count,
+        complexity=complexity,
+        categories=tuple(
+            category for category in GOAL_CATEGORY_KEYWORDS if category in found_categories
+        ),
+        time_sensitive=not found_keywords.isdisjoint(TIME_KEYWORDS),
+    )
+
+
+def analyze_goal_complexity(goal: str) -> str:
+    """Analyze the complexity and characteristics of a goal.
     
-    for category, keywords in indicators.items():
-        if any(keyword in goal_lower for keyword in keywords):
-            detected_categories.append(category)
+    Args:
+        goal: The goal string to analyze
+        
+    Returns:
+        Analysis summary as a string
+    """
+    analysis = analyze_goal(goal)
+    analysis_points = [
+        f"Word count: {analysis.word_count}",
+        f"Complexity level: {analysis.complexity}",
+    ]
     
-    if detected_categories:
-        analysis_points.append(f"Detected categories: {', '.join(detected_categories)}")
+    if analysis.categories:
+        analysis_points.append(f"Detected categories: {', '.join(analysis.categories)}")
     
     # Time indicators
-    time_keywords = ["urgent", "asap", "quickly", "immediately", "long-term", "future", "eventually"]
-    if any(keyword in goal_lower for keyword in time_keywords):
+    if analysis.time_sensitive:
         analysis_points.append("Time sensitivity detected")
     
     return " | ".join(analysis_points)
 
 
-def extract_steps_from_text(text: str) -> List[str]:
-    """Extract step items from AI-generated text.
+def _iter_steps(text: str) -> Iterator[str]:
+    """Yield raw step items from AI-generated text, in order.
     
     Args:
         text: Text containing steps or plan
         
-    Returns:
-        List of extracted steps
+    Yields:
+        Extracted steps, before cleanup
     """
-    steps = []
-    
-    # Look for numbered lists
-    numbered_pattern = r'^\d+\.\s*(.+)$'
-    bullet_pattern = r'^[-*•]\s*(.+)$'
-    
-    lines = text.split('\n')
+    found_steps = False
     current_step = ""
     
-    for line in lines:
+    # Read the lines lazily, so extraction stops as soon as the caller has
+    # enough steps without splitting the whole response up front
+    for line in StringIO(text):
         line = line.strip()
         if not line:
             continue
         
-        # Check for numbered items
-        numbered_match = re.match(numbered_pattern, line)
-        if numbered_match:
+        # Check for numbered or bullet items
+        list_item_match = _LIST_ITEM_RE.match(line)
+        if list_item_match:
             if current_step:
-                steps.append(current_step.strip())
-            current_step = numbered_match.group(1)
+                found_steps = True
+                yield current_step.strip()
+            current_step = list_item_match.group(1)
             continue
         
-        # Check for bullet items
-        bullet_match = re.match(bullet_pattern, line)
-        if bullet_match:
+        # Check if line looks like a step (starts with action verb). The line is
+        # stripped and non-empty, so a single split gives its first word.
+        first_word = line.split(None, 1)[0].lower()
+        if first_word.startswith(ACTION_VERBS):
             if current_step:
-                steps.append(current_step.strip())
-            current_step = bullet_match.group(1)
-            continue
-        
-        # Check if line looks like a step (starts with action verb)
-        action_verbs = [
-            'create', 'develop', 'build', 'design', 'implement', 'test', 'deploy',
-            'analyze', 'research', 'study', 'plan', 'organize', 'prepare',
-            'write', 'document', 'review', 'validate', 'verify', 'establish',
-            'configure', 'install', 'setup', 'initialize', 'launch', 'publish',
-            'gather', 'collect', 'identify', 'define', 'specify', 'determine'
-        ]
-        
-        first_word = line.split()[0].lower() if line.split() else ""
-        if any(first_word.startswith(verb) for verb in action_verbs):
-            if current_step:
-                steps.append(current_step.strip())
+                found_steps = True
+                yield current_step.strip()
             current_step = line
             continue
         
@@ -172,52 +229,94 @@ def extract_steps_from_text(text: str) -> List[str]:
     
     # Add the last step
     if current_step:
-        steps.append(current_step.strip())
+        found_steps = True
+        yield current_step.strip()
     
-    # Fallback: split by sentences if no clear steps found
-    if not steps and text:
-        sentences = re.split(r'[.!?]+', text)
-        steps = [s.strip() for s in sentences if len(s.strip()) > 10]
+    # Fallback: split by sentences if no clear steps found (lazily, as only
+    # the first few are used)
+    if not found_steps and text:
+        for sentence_match in _SENTENCE_RE.finditer(text):
+            sentence = sentence_match.group().strip()
+            if len(sentence) > 10:
+                yield sentence
+
+
+def extract_steps_from_text(text: str) -> List[str]:
+    """Extract step items from AI-generated text.
     
-    return steps[:20]  # Limit to 20 steps for manageable output
+    Args:
+        text: Text containing steps or plan
+        
+    Returns:
+        List of extracted steps
+    """
+    return list(islice(_iter_steps(text), MAX_PLAN_STEPS))
 
 
-def validate_and_improve_steps(steps: List[str]) -> List[str]:
+def _improve_step(step: str) -> Optional[str]:
+    """Clean up a single step, or return None if it should be dropped.
+    
+    Args:
+        step: Raw step
+        
+    Returns:
+        Improved step, or None if it is too short to be actionable
+    """
+    if not step or len(step.strip()) < 5:
+        return None
+    
+    # Clean up the step
+    step = step.strip()
+    
+    # Remove leading numbers or bullets if they exist (the step is already
+    # stripped, so only its start can change)
+    step = step.lstrip(_LEADING_BULLET_CHARS)
+    if step and (step[0].isdecimal() or step[0].isspace()):
+        step = _LEADING_BULLET_RE.sub('', step)
+    
+    # Ensure step starts with capital letter
+    if step and step[0].islower():
+        step = step[0].upper() + step[1:]
+    
+    # Ensure step ends with period if it's a sentence
+    if step and not step.endswith(('.', '!', '?', ':')):
+        step += '.'
+    
+    # Skip if too short or not actionable
+    if len(step) < 10:
+        return None
+    
+    return step
+
+
+def validate_and_improve_steps(steps: Iterable[str]) -> List[str]:
     """Validate and improve the quality of steps.
     
     Args:
-        steps: List of raw steps
+        steps: Raw steps
         
     Returns:
         Improved list of steps
     """
-    improved_steps = []
+    return [step for step in map(_improve_step, steps) if step is not None]
+
+
+def basic_plan_steps(goal: str) -> List[str]:
+    """Build the generic plan used when no specific plan is available.
     
-    for step in steps:
-        if not step or len(step.strip()) < 5:
-            continue
-        
-        # Clean up the step
-        step = step.strip()
-        
-        # Remove leading numbers or bullets if they exist
-        step = re.sub(r'^[\d\.\-\*•\s]+', '', step).strip()
-        
-        # Ensure step starts with capital letter
-        if step and step[0].islower():
-            step = step[0].upper() + step[1:]
-        
-        # Ensure step ends with period if it's a sentence
-        if step and not step.endswith(('.', '!', '?', ':')):
-            step += '.'
-        
-        # Skip if too short or not actionable
-        if len(step) < 10:
-            continue
+    Args:
+        goal: The goal to plan for
         
-        improved_steps.append(step)
-    
-    return improved_steps
+    Returns:
+        Basic sequential steps for the goal
+    """
+    return [
+        f"Define and clarify the specific requirements for: {goal}",
+        f"Research best practices and approaches for achieving: {goal}",
+        f"Create a detailed implementation plan for: {goal}",
+        f"Execute the plan with regular progress monitoring",
+        f"Review and validate the results against the original goal"
+    ]
 
 
 # Create the planning agent
@@ -255,6 +354,8 @@ This analysis will help in creating a comprehensive and realistic plan.
 async def create_plan(request: PlanningRequest) -> PlanningResult:
     """Create a detailed plan for achieving the specified goal.
     
+    Plans are cached in-process for the last MAX_CACHED_PLANS goals.
+    
     Args:
         request: Planning request with the goal
         
@@ -263,6 +364,19 @@ async def create_plan(request: PlanningRequest) -> PlanningResult:
     """
     goal = request.goal
     
+    # A short goal with no detected category gets a generic plan from the model
+    # anyway, so optionally skip the LLM call and use the basic plan directly
+    if config.PLANNING_FAST_PATH:
+        analysis = analyze_goal(goal)
+        if analysis.complexity == "Simple" and not analysis.categories:
+            return PlanningResult.model_construct(steps=basic_plan_steps(goal))
+    
+    with _PLAN_CACHE_LOCK:
+        cached_steps = _PLAN_CACHE.get(goal)
+        if cached_steps is not None:
+            _PLAN_CACHE.move_to_end(goal)
+            return PlanningResult.model_construct(steps=list(cached_steps))
+    
     # Use the planning agent to create a comprehensive plan
     result = await planning_agent.run(
         f"""Please create a detailed, actionable plan to achieve the following goal:
@@ -286,25 +400,25 @@ Format your response as a numbered list of specific, actionable steps. Each step
 Provide a comprehensive plan that someone could follow to achieve this goal."""
     )
     
-    # Extract steps from the AI response
+    # Extract, improve and validate the steps from the AI response in one pass
     ai_response = result.data if result.data else ""
-    extracted_steps = extract_steps_from_text(ai_response)
+    final_steps = validate_and_improve_steps(islice(_iter_steps(ai_response), MAX_PLAN_STEPS))
     
-    # Improve and validate the steps
-    final_steps = validate_and_improve_steps(extracted_steps)
+    # Only plans extracted from the AI's response are cached, a goal that fell
+    # back to the basic steps is planned again on the next call
+    if final_steps:
+        with _PLAN_CACHE_LOCK:
+            _PLAN_CACHE[goal] = tuple(final_steps)
+            _PLAN_CACHE.move_to_end(goal)
+            while len(_PLAN_CACHE) > MAX_CACHED_PLANS:
+                _PLAN_CACHE.popitem(last=False)
     
     # Ensure we have at least some basic steps even if extraction failed
     if not final_steps:
-        # Create fallback basic steps
-        final_steps = [
-            f"Define and clarify the specific requirements for: {goal}",
-            f"Research best practices and approaches for achieving: {goal}",
-            f"Create a detailed implementation plan for: {goal}",
-            f"Execute the plan with regular progress monitoring",
-            f"Review and validate the results against the original goal"
-        ]
-    
-    return PlanningResult(steps=final_steps)
+        final_steps = basic_plan_steps(goal)
+    
+    # The steps are already a list of cleaned strings, so skip re-running validation
+    return PlanningResult.model_construct(steps=final_steps)
 
 
 # Export the main function
@@ -1,16 +1,27 @@
 """Research Agent for web search and information synthesis."""
 
+import asyncio
+import logging
 import os
-from typing import List
-from urllib.parse import urlparse
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from dataclasses import dataclass, field
+from itertools import islice
+from operator import itemgetter
+from typing import List, NamedTuple
 
 from duckduckgo_search import DDGS
-from pydantic import HttpUrl
 from pydantic_ai import Agent, RunContext
 
 from ..config import MODEL_NAME
 from ..models import ResearchQuery, ResearchResult
 
+logger = logging.getLogger(__name__)
+
 
 # System prompt for the research agent
 RESEARCH_SYSTEM_PROMPT = """
@@ -37,56 +48,180 @@ Guidelines:
 """
 
 
-def search_web(query: str, max_results: int = 10) -> List[dict]:
+# Recent search results keyed by (query, max_results), as (expiry, results),
+# so repeated queries don't hit DuckDuckGo (and its rate limiting) again
+SEARCH_CACHE_TTL = 600  # seconds
+MAX_CACHED_SEARCHES = 256
+_SEARCH_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_SEARCH_CACHE_LOCK = threading.Lock()
+
+
+class SearchResult(NamedTuple):
+    """A single web search result."""
+    title: str
+    body: str
+    href: str
+
+
+# Pulls the SearchResult fields out of a DuckDuckGo result dict in one call
+_result_fields = itemgetter('title', 'body', 'href')
+
+
+# DuckDuckGo backends tried in order on each search attempt, the next one
+# started (hedging) once the earlier ones failed or SEARCH_HEDGE_DELAY passed
+SEARCH_BACKENDS = ("html", "lite")
+SEARCH_ATTEMPTS = 2
+SEARCH_TIMEOUT = 10  # seconds per attempt
+SEARCH_HEDGE_DELAY = 2  # seconds
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="research-search")
+
+# One DDGS session per search thread, reused across searches so its HTTP
+# connections stay open (DDGS isn't safe to share between threads)
+_thread_local = threading.local()
+
+
+def search_web(query: str, max_results: int = 10) -> List[SearchResult]:
     """Search the web using DuckDuckGo and return results.
     
+    Results are cached in-process for SEARCH_CACHE_TTL seconds.
+    
     Args:
         query: The search query
         max_results: Maximum number of results to return
         
     Returns:
-        List of search results with title, body, and href
+        List of search results (title, body, href)
     """
-    import time
+    cache_key = (query, max_results)
+    with _SEARCH_CACHE_LOCK:
+        cached = _SEARCH_CACHE.get(cache_key)
+        if cached is not None and cached[0] > time.monotonic():
+            return list(cached[1])
+    
+    results = _search_ddgs(query, max_results)
     
-    # Try multiple times with different approaches
-    for attempt in range(3):
+    # Only successful searches are cached, failures are retried on the next call
+    if results:
+        with _SEARCH_CACHE_LOCK:
+            _SEARCH_CACHE[cache_key] = (time.monotonic() + SEARCH_CACHE_TTL, results)
+            _SEARCH_CACHE.move_to_end(cache_key)
+            while len(_SEARCH_CACHE) > MAX_CACHED_SEARCHES:
+                _SEARCH_CACHE.popitem(last=False)
+    return list(results)
+
+
+def _search_backend(query: str, max_results: int, backend: str) -> List[SearchResult]:
+    """Run a single DuckDuckGo text search on one backend."""
+    ddgs = getattr(_thread_local, "ddgs", None)
+    if ddgs is None:
+        ddgs = _thread_local.ddgs = DDGS()
+    
+    try:
+        raw_results = ddgs.text(query, max_results=max_results, backend=backend)
+    except Exception:
+        # Start the next search on a fresh session (new cookies and client fingerprint)
+        _thread_local.ddgs = None
+        raise
+    
+    # Skip empty entries, never take more than max_results
+    return [_to_search_result(result) for result in islice(raw_results, max_results) if result]
+
+
+def _to_search_result(result: dict) -> SearchResult:
+    """Convert a DuckDuckGo result dict, with defaults for missing keys."""
+    try:
+        return SearchResult(*_result_fields(result))
+    except KeyError:
+        return SearchResult(
+            result.get('title', 'No title'),
+            result.get('body', 'No content'),
+            result.get('href', 'No URL'),
+        )
+
+
+def _search_ddgs(query: str, max_results: int) -> List[SearchResult]:
+    """Query DuckDuckGo, retrying on failures or empty results."""
+    for attempt in range(SEARCH_ATTEMPTS):
+        logger.debug("Search attempt %d for query: %s", attempt + 1, query)
         try:
-            print(f"Search attempt {attempt + 1} for query: {query}")
-            with DDGS() as ddgs:
-                results = []
-                search_iter = ddgs.text(query, max_results=max_results)
-                
-                for result in search_iter:
-                    if result:  # Make sure result is not None
-                        results.append({
-                            'title': result.get('title', 'No title'),
-                            'body': result.get('body', 'No content'),
-                            'href': result.get('href', 'No URL')
-                        })
-                
+            results = _search_hedged(query, max_results)
+        except FuturesTimeoutError:
+            logger.warning("Search attempt %d timed out after %ss", attempt + 1, SEARCH_TIMEOUT)
+        else:
+            if results:
+                logger.debug("Search successful: found %d results", len(results))
+                return results
+            logger.info("Search attempt %d: No results found", attempt + 1)
+        
+        if attempt < SEARCH_ATTEMPTS - 1:  # Don't sleep on last attempt
+            time.sleep(1)  # Brief pause between attempts
+    
+    logger.error("All search attempts failed for query: %s", query)
+    return []
+
+
+def _search_hedged(query: str, max_results: int) -> List[SearchResult]:
+    """Run one search attempt over SEARCH_BACKENDS, hedging slow backends.
+    
+    The first backend is queried alone. The next one is only started when the
+    running searches have all failed or come back empty, or SEARCH_HEDGE_DELAY
+    passed without a result, so a healthy backend answers without a second
+    request to DuckDuckGo. The first non-empty result is returned.
+    
+    Args:
+        query: The search query
+        max_results: Maximum number of results to return
+        
+    Returns:
+        The first non-empty list of results, or an empty list
+        
+    Raises:
+        FuturesTimeoutError: If no backend answered within SEARCH_TIMEOUT
+    """
+    deadline = time.monotonic() + SEARCH_TIMEOUT
+    unstarted = list(SEARCH_BACKENDS)
+    pending: set[Future] = set()
+    try:
+        while unstarted or pending:
+            if unstarted:
+                backend = unstarted.pop(0)
+                pending.add(_SEARCH_POOL.submit(_search_backend, query, max_results, backend))
+            
+            # Wait no longer than the hedge delay while another backend is left
+            remaining = max(deadline - time.monotonic(), 0)
+            timeout = min(SEARCH_HEDGE_DELAY, remaining) if unstarted else remaining
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.warning("Search failed: %s", e)
+                    continue
                 if results:
-                    print(f"Search successful: found {len(results)} results")
                     return results
-                else:
-                    print(f"Search attempt {attempt + 1}: No results found")
-                    
-        except Exception as e:
-            print(f"Search attempt {attempt + 1} failed: {e}")
-            if attempt < 2:  # Don't sleep on last attempt
-                time.sleep(1)  # Brief pause between attempts
-    
-    print("All search attempts failed")
-    return []
+            if not done and time.monotonic() >= deadline:
+                raise FuturesTimeoutError()
+        return []
+    finally:
+        # Drop searches still queued for a pool thread (a running one can't be
+        # interrupted, its result is just left unused)
+        for future in pending:
+            future.cancel()
+
+
+# http(s) URL with a host and no whitespace, for filtering search result links
+_URL_RE = re.compile(r"^https?://[^\s/$.?#][^\s]*$", re.IGNORECASE)
 
 
 def validate_url(url_string: str) -> bool:
-    """Validate if a string is a proper URL."""
-    try:
-        result = urlparse(url_string)
-        return all([result.scheme, result.netloc])
-    except Exception:
-        return False
+    """Validate if a string is a proper http(s) URL."""
+    return _URL_RE.match(url_string) is not None
+
+
+@dataclass
+class ResearchDeps:
+    """Collects the results of the agent's web searches during a research run."""
+    search_results: List[SearchResult] = field(default_factory=list)
 
 
 # Create the research agent with better configuration
@@ -94,13 +229,23 @@ research_agent = Agent(
     model=MODEL_NAME,
     name="Research Agent",
     system_prompt=RESEARCH_SYSTEM_PROMPT,
-    deps_type=RunContext,
+    deps_type=ResearchDeps,
     retries=2,
 )
 
 
+# Formatting of each search result returned to the agent
+_RESULT_TEMPLATE = """
+Result {i}:
+Title: {result.title}
+URL: {result.href}
+Content: {result.body}
+---
+"""
+
+
 @research_agent.tool
-async def web_search(ctx: RunContext, query: str, max_results: int = 8) -> str:
+async def web_search(ctx: RunContext[ResearchDeps], query: str, max_results: int = 8) -> str:
     """Search the web for information related to the query.
     
     Args:
@@ -111,23 +256,20 @@ async def web_search(ctx: RunContext, query: str, max_results: int = 8) -> str:
     Returns:
         Formatted search results as a string
     """
-    search_results = search_web(query, max_results)
+    # search_web blocks on network I/O and retry sleeps, run it in a worker thread
+    search_results = await asyncio.to_thread(search_web, query, max_results)
+    
+    # Keep the results so research_query can cite them without searching again
+    if ctx.deps is not None:
+        ctx.deps.search_results.extend(search_results)
     
     if not search_results:
         return "No search results found for the query."
     
-    formatted_results = []
-    for i, result in enumerate(search_results, 1):
-        formatted_result = f"""
-Result {i}:
-Title: {result['title']}
-URL: {result['href']}
-Content: {result['body']}
----
-"""
-        formatted_results.append(formatted_result)
-    
-    return "\n".join(formatted_results)
+    return "\n".join(
+        _RESULT_TEMPLATE.format(i=i, result=result)
+        for i, result in enumerate(search_results, 1)
+    )
 
 
 async def research_query(query: ResearchQuery) -> ResearchResult:
@@ -139,6 +281,7 @@ async def research_query(query: ResearchQuery) -> ResearchResult:
     Returns:
         Research results with summary and source URLs
     """
+    deps = ResearchDeps()
     try:
         # Run the agent with the query
         result = await research_agent.run(
@@ -150,43 +293,36 @@ Instructions:
 3. Provide a comprehensive summary of your findings
 4. List all the source URLs you used in your research
 
-Your response should be well-structured and informative."""
+Your response should be well-structured and informative.""",
+            deps=deps,
         )
     except Exception as e:
         # Graceful degradation if agent fails
-        print(f"Research agent error: {e}")
-        return ResearchResult(
+        logger.exception("Research agent error: %s", e)
+        return ResearchResult.model_construct(
             summary=f"Unable to complete research for query: '{query.query}'. Error: {str(e)}",
             source_urls=[]
         )
     
-    # Extract source URLs from the agent's context
-    # This is a simplified approach - in production, you'd want more sophisticated URL extraction
-    search_results = search_web(query.query, max_results=6)
-    source_urls = []
-    
-    for result_item in search_results:
-        url = result_item.get('href', '')
-        if validate_url(url):
-            try:
-                source_urls.append(HttpUrl(url))
-            except Exception:
-                continue  # Skip invalid URLs
-    
-    # Ensure we have at least some sources, even if search failed
-    if not source_urls and search_results:
-        # Try to extract any valid URLs from search results
-        for result_item in search_results:
-            url = result_item.get('href', '')
-            if url and url.startswith(('http://', 'https://')):
-                try:
-                    source_urls.append(HttpUrl(url))
-                except Exception:
-                    continue
+    # Cite the results of the agent's own searches, only searching again if it
+    # answered without searching
+    search_results = deps.search_results
+    if not search_results:
+        search_results = await asyncio.to_thread(search_web, query.query, max_results=6)
+    # One pass, stopping at the 6th distinct valid URL (a manageable number of
+    # sources); several searches often return the same page
+    source_urls = list(islice(
+        dict.fromkeys(
+            result_item.href for result_item in search_results if validate_url(result_item.href)
+        ),
+        6,
+    ))
     
-    return ResearchResult(
+    # Every field is already valid (a str summary, and URLs that passed
+    # validate_url), so skip re-running validation
+    return ResearchResult.model_construct(
         summary=result.data if result.data else "Unable to generate research summary.",
-        source_urls=source_urls[:6]  # Limit to 6 sources for manageable output
+        source_urls=source_urls
     )
 
 
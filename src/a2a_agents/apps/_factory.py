@@ -0,0 +1,61 @@
+"""Shared construction and local serving of the agents' A2A applications."""
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.routing import Route
+
+from .middleware import DOCS_REDIRECT, CustomTitleMiddleware
+
+
+def build_a2a_app(agent, name: str, url: str, description: str | None = None) -> Starlette:
+    """Build an agent's A2A app with the middleware and routes every agent uses.
+
+    Args:
+        agent: The pydantic-ai agent to serve
+        name: Agent name, shown in the agent card and the /docs page
+        url: Public URL of the deployment
+        description: Agent description for the agent card
+
+    Returns:
+        The ASGI application
+    """
+    a2a_app = agent.to_a2a(
+        name=name,
+        url=url,
+        description=description,
+        middleware=[
+            Middleware(GZipMiddleware, minimum_size=1024),
+            Middleware(CustomTitleMiddleware, agent_name=name),
+        ],
+    )
+
+    # Add root redirect to /docs, for GET/HEAD only so that POST / still reaches
+    # the A2A JSON-RPC endpoint
+    a2a_app.routes.insert(0, Route("/", DOCS_REDIRECT, methods=["GET", "HEAD"]))
+
+    return a2a_app
+
+
+def run_locally(agent, name: str, port: int, description: str | None = None) -> None:
+    """Serve an agent's A2A app with uvicorn for local development.
+
+    Args:
+        agent: The pydantic-ai agent to serve
+        name: Agent name, shown in the agent card and the /docs page
+        port: Local port to listen on
+        description: Agent description for the agent card
+    """
+    import uvicorn
+    from ..config import config
+
+    config.setup_api_keys()
+
+    uvicorn.run(
+        build_a2a_app(agent, name, f"http://localhost:{port}", description),
+        host="0.0.0.0",
+        port=port,
+        reload=False,
+        log_level="info",
+        access_log=config.ACCESS_LOG,
+    )
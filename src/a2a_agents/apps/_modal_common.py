@@ -0,0 +1,18 @@
+"""Modal image and secrets shared by every agent's deployment."""
+
+import modal
+
+from ..config import config  # Loads .env once, its keys are used by the secret below
+
+# Modal image with dependencies from root pyproject.toml + git support. Defined
+# once so all four apps resolve to the same image and share its cached layers.
+IMAGE = (
+    modal.Image.debian_slim(python_version="3.11")
+    .apt_install("git")  # Required for GitPython (GitHub repository analysis)
+    .pip_install_from_pyproject("pyproject.toml")  # Use root dependencies
+    # Precompile stdlib + site-packages so cold starts load cached bytecode
+    .run_commands("python -m compileall -q -j 0 /usr/local/lib/python3.11")
+)
+
+# Gemini API key for the agents, built once for all four apps
+GEMINI_SECRET = modal.Secret.from_dict({"GEMINI_API_KEY": config.GEMINI_API_KEY or ""})
@@ -1,37 +1,124 @@
 """Shared middleware for A2A agent applications."""
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+import hashlib
 
+from starlette.datastructures import MutableHeaders
+from starlette.responses import RedirectResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-class CustomTitleMiddleware(BaseHTTPMiddleware):
-    """Middleware to customize the title and heading in the /docs page."""
+# Cache lifetime of the root redirect and the rewritten /docs page, which only
+# change on redeploy
+DOCS_CACHE_CONTROL = "public, max-age=3600"
 
-    def __init__(self, app, agent_name: str):
-        super().__init__(app)
+# Root redirect to /docs, built once. A Response instance is itself an ASGI app,
+# so mounting it directly as a route endpoint skips the per-request
+# Request/Response construction of a function endpoint.
+DOCS_REDIRECT = RedirectResponse(url="/docs", headers={"cache-control": DOCS_CACHE_CONTROL})
+
+
+class CustomTitleMiddleware:
+    """Middleware to customize the title and heading in the /docs page.
+
+    Written as a pure ASGI middleware so that every request other than /docs
+    (including the A2A JSON-RPC endpoint) is handed straight to the wrapped app
+    without the per-request Request/Response wrapping of BaseHTTPMiddleware.
+    """
+
+    def __init__(self, app: ASGIApp, agent_name: str):
+        self.app = app
         self.agent_name = agent_name
+        # (original, replacement) byte strings, built once per app
+        self._replacements: list[tuple[bytes, bytes]] = [
+            (b"<title>FastA2A Agent</title>", f"<title>{agent_name}</title>".encode("utf-8")),
+            ("<h1>🤖 FastA2A Agent</h1>".encode("utf-8"), f"<h1>🤖 {agent_name}</h1>".encode("utf-8")),
+        ]
+        # Weak ETag of the rewritten page, set once it has been served. Weak, as
+        # the gzip and identity encodings of the page share it
+        self._etag: str | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Only a GET or HEAD of /docs is rewritten, everything else passes
+        # straight through
+        if (
+            scope["type"] != "http"
+            or scope["path"] != "/docs"
+            or scope["method"] not in ("GET", "HEAD")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # Answer revalidation of an unchanged page without reading or rewriting it
+        if self._etag is not None and self._is_not_modified(scope):
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [
+                    (b"etag", self._etag.encode("latin-1")),
+                    (b"cache-control", DOCS_CACHE_CONTROL.encode("latin-1")),
+                    (b"vary", b"Accept-Encoding"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        # A HEAD is run as a GET, so that its headers describe the rewritten page
+        # rather than the original file; only the body is then left out
+        is_head = scope["method"] == "HEAD"
+        if is_head:
+            scope = {**scope, "method": "GET"}
+
+        start_message: Message | None = None
+        passthrough = False
+        chunks: list[bytes] = []
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                if message["status"] != 200:
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Hold the start message until the body has been rewritten
+                    start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            # Replace title and heading with custom agent name, directly on the
+            # UTF-8 bytes (no decode/encode round trip)
+            body = b"".join(chunks)
+            for original, replacement in self._replacements:
+                body = body.replace(original, replacement)
+
+            if self._etag is None:
+                self._etag = f'W/"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'
+
+            # Send the held start message with an updated content-length, and
+            # an ETag for the rewritten rather than the original file
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["content-length"] = str(len(body))
+            headers["etag"] = self._etag
+            headers["cache-control"] = DOCS_CACHE_CONTROL
+            if is_head:
+                # GZipMiddleware only adds this for a non-empty body
+                headers["vary"] = "Accept-Encoding"
+                body = b""
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
 
-    async def dispatch(self, request, call_next):
-        response = await call_next(request)
-        if request.url.path == "/docs" and response.status_code == 200:
-            # Read and modify HTML content
-            body = b""
-            async for chunk in response.body_iterator:
-                body += chunk
-            content = body.decode('utf-8')
-
-            # Replace title and heading with custom agent name
-            modified_content = content.replace("<title>FastA2A Agent</title>", f"<title>{self.agent_name}</title>")
-            modified_content = modified_content.replace("<h1>🤖 FastA2A Agent</h1>", f"<h1>🤖 {self.agent_name}</h1>")
-
-            # Create new response with updated content-length
-            headers = dict(response.headers)
-            headers['content-length'] = str(len(modified_content.encode('utf-8')))
-
-            return Response(
-                content=modified_content,
-                status_code=response.status_code,
-                headers=headers,
-                media_type="text/html"
-            )
-        return response
+    def _is_not_modified(self, scope: Scope) -> bool:
+        """Check whether the request's If-None-Match matches the page's ETag."""
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                # Weak comparison, ignoring any W/ prefix on either side
+                tags = [tag.strip().removeprefix("W/") for tag in value.decode("latin-1").split(",")]
+                return "*" in tags or self._etag.removeprefix("W/") in tags
+        return False
@@ -28,9 +28,14 @@ class Config:
     # Server Configuration  
     HOST: str = os.getenv("A2A_HOST", "0.0.0.0")
     PORT: int = int(os.getenv("A2A_PORT", "8000"))
+    # Per-request access log lines are off by default (set A2A_ACCESS_LOG=1 to enable)
+    ACCESS_LOG: bool = os.getenv("A2A_ACCESS_LOG", "0").lower() in ("1", "true", "yes")
     
     # Agent Configuration
     RETRIES: int = int(os.getenv("A2A_RETRIES", "2"))
+    # Answer short goals with no detected category with the basic plan, without
+    # an LLM call (off by default, set A2A_PLANNING_FAST_PATH=1 to enable)
+    PLANNING_FAST_PATH: bool = os.getenv("A2A_PLANNING_FAST_PATH", "0").lower() in ("1", "true", "yes")
     
     @classmethod
     def get_model_name(cls) -> str:
@@ -42,9 +47,20 @@ class Config:
         """Set the model name (useful for testing)."""
         cls.MODEL_NAME = model_name
     
+    # Set once setup_api_keys has run; the keys don't change within a process
+    _api_keys_ready: bool = False
+    
     @classmethod
     def setup_api_keys(cls) -> None:
-        """Set up API key compatibility between GEMINI_API_KEY and GOOGLE_API_KEY."""
+        """Set up API key compatibility between GEMINI_API_KEY and GOOGLE_API_KEY.
+        
+        Only the first call does any work, later calls (e.g. each app factory
+        call in a warm container) return immediately.
+        """
+        if cls._api_keys_ready:
+            return
+        cls._api_keys_ready = True
+        
         if cls.GEMINI_API_KEY and not cls.GOOGLE_API_KEY:
             os.environ["GOOGLE_API_KEY"] = cls.GEMINI_API_KEY
             cls.GOOGLE_API_KEY = cls.GEMINI_API_KEY
@@ -1,9 +1,9 @@
 """Pydantic models for A2A communication between agents."""
 
 from enum import Enum
-from typing import List, Optional, Union
+from typing import Annotated, List, Literal, Optional, Union
 
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import AfterValidator, BaseModel, Field, TypeAdapter
 
 
 class TaskType(str, Enum):
@@ -31,20 +31,42 @@ class ResearchQuery(BaseModel):
 class ResearchResult(BaseModel):
     """Output model for the Research Agent."""
     summary: str = Field(..., description="Synthesized summary of research findings")
-    source_urls: List[HttpUrl] = Field(..., description="List of source URLs used in research")
+    source_urls: List[str] = Field(..., description="List of source URLs used in research")
 
 
 # Code Agent Models
+# Longest repository URL accepted for review (the same limit as pydantic's HttpUrl)
+MAX_REPOSITORY_URL_LENGTH = 2083
+
+
+def _check_repository_url(url: str) -> str:
+    """Check that a repository URL is an http(s) URL without whitespace.
+    
+    A cheap prefix check instead of pydantic's full URL parser; the URL is only
+    handed to git, which rejects anything it cannot clone.
+    """
+    if (
+        not url.startswith(("https://", "http://"))
+        or len(url) > MAX_REPOSITORY_URL_LENGTH
+        or any(char.isspace() for char in url)
+    ):
+        raise ValueError("github_url must be an http(s) URL")
+    return url
+
+
+RepositoryUrl = Annotated[str, AfterValidator(_check_repository_url)]
+
+
 class CodeGenerationRequest(BaseModel):
     """Input model for code generation task."""
-    task: TaskType = Field(..., description="Type of task to perform")
+    task: Literal[TaskType.GENERATE] = Field(..., description="Type of task to perform")
     code_description: str = Field(..., description="Description of code to generate")
 
 
 class CodeReviewRequest(BaseModel):
     """Input model for code review task."""
-    task: TaskType = Field(..., description="Type of task to perform")
-    github_url: HttpUrl = Field(..., description="GitHub repository URL to review")
+    task: Literal[TaskType.REVIEW] = Field(..., description="Type of task to perform")
+    github_url: RepositoryUrl = Field(..., description="GitHub repository URL to review")
     branch: Optional[str] = Field(None, description="Branch to review (defaults to main)")
 
 
@@ -91,22 +113,17 @@ class PlanningResult(BaseModel):
 
 
 # Unified Code Agent Request Model
-class CodeAgentRequest(BaseModel):
-    """Unified input model for the Code Agent."""
-    task: TaskType = Field(..., description="Type of task to perform")
-    code_description: Optional[str] = Field(None, description="Description of code to generate (for GENERATE tasks)")
-    github_url: Optional[HttpUrl] = Field(None, description="GitHub repository URL to review (for REVIEW tasks)")
-    branch: Optional[str] = Field(None, description="Branch to review (defaults to main)")
-    
-    def model_validate(cls, data):
-        """Validate that required fields are present based on task type."""
-        if isinstance(data, dict):
-            task = data.get('task')
-            if task == TaskType.GENERATE and not data.get('code_description'):
-                raise ValueError("code_description is required for GENERATE tasks")
-            elif task == TaskType.REVIEW and not data.get('github_url'):
-                raise ValueError("github_url is required for REVIEW tasks")
-        return super().model_validate(data)
+# Tagged on "task": validation picks the request model from the task value
+# instead of trying each model in turn, and each model enforces its own
+# required fields
+CodeAgentRequest = Annotated[
+    Union[CodeGenerationRequest, CodeReviewRequest],
+    Field(discriminator="task"),
+]
+
+# Validator for raw Code Agent requests (CodeAgentRequest is a union, not a model
+# with model_validate/model_validate_json), built once at import
+code_agent_request_adapter: TypeAdapter[CodeAgentRequest] = TypeAdapter(CodeAgentRequest)
 
 # Unified Code Agent Result Model  
 class CodeAgentResult(BaseModel):
@@ -0,0 +1,7 @@
+"""Shared pytest configuration."""
+
+import os
+
+# The agent modules create their Gemini-backed agents on import, which needs an
+# API key to be set (the unit tests never call the model)
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
@@ -0,0 +1,124 @@
+"""Tests for the code agent's repository helpers."""
+
+import os
+import shutil
+import subprocess
+import tempfile
+
+import pytest
+
+from a2a_agents.agents import code
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+# Files of the test repository, relative path to content
+REPO_FILES = {
+    "README.md": "# Test\n",
+    "Makefile": "all:\n",
+    "src/main.py": "print('hello')\n",
+    "src/pkg/util.PY": "x = 1\n",
+    "src/app.min.js": "var a;\n",
+    "src/big.txt": "x" * 200,
+    "node_modules/dep/index.js": "module.exports = 1;\n",
+    ".github/workflow.yml": "on: push\n",
+    "docs/.hidden.py": "secret = 1\n",
+    "docs/with space.md": "Spaces\n",
+}
+
+
+def git(repo: str, *args: str) -> None:
+    """Run a git command in repo."""
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=repo, check=True, capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """A git repository with committed files, plus a symlink and an untracked file."""
+    monkeypatch.setattr(code, "MAX_FILE_BYTES", 100)
+    for relative_path, content in REPO_FILES.items():
+        path = tmp_path / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    (tmp_path / "link.py").symlink_to("src/main.py")
+    git(str(tmp_path), "init", "-q", "-b", "main")
+    git(str(tmp_path), "add", "-A")
+    git(str(tmp_path), "commit", "-q", "-m", "Initial commit")
+    (tmp_path / "untracked.py").write_text("y = 2\n")
+    return str(tmp_path)
+
+
+def relative(files_by_ext, root):
+    """Convert a files-by-extension mapping to sorted paths relative to root."""
+    return {
+        ext: sorted(os.path.relpath(path, root) for path in paths)
+        for ext, paths in files_by_ext.items()
+    }
+
+
+def test_list_tracked_files_parses_ls_tree(repo):
+    """Committed files are listed by extension, with the walk's skip rules."""
+    files_by_ext = code._list_tracked_files(repo)
+
+    assert relative(files_by_ext, repo) == {
+        ".md": ["README.md", os.path.join("docs", "with space.md")],
+        "": ["Makefile"],
+        ".py": [os.path.join("src", "main.py"), os.path.join("src", "pkg", "util.PY")],
+    }
+
+
+def test_list_tracked_files_matches_filesystem_walk(repo, tmp_path_factory):
+    """The git listing and the filesystem walk agree on the same tree."""
+    os.remove(os.path.join(repo, "untracked.py"))
+    copy = str(tmp_path_factory.mktemp("copy") / "repo")
+    shutil.copytree(repo, copy, symlinks=True, ignore=shutil.ignore_patterns(".git"))
+
+    assert code._list_tracked_files(copy) is None
+    assert relative(code.collect_repository_files(copy), copy) == relative(
+        code.collect_repository_files(repo), repo
+    )
+
+
+def test_clone_repository_falls_back_to_default_branch(repo):
+    """A branch the remote doesn't have clones the default branch instead."""
+    path = code.clone_repository(f"file://{repo}", "missing")
+    try:
+        assert os.path.isfile(os.path.join(path, "README.md"))
+    finally:
+        shutil.rmtree(path)
+
+
+def test_clone_repository_failure_clones_once_and_cleans_up(tmp_path, monkeypatch):
+    """A failed clone isn't retried and leaves no temporary directory behind."""
+    created = []
+    real_mkdtemp = tempfile.mkdtemp
+
+    def mkdtemp():
+        created.append(real_mkdtemp(dir=tmp_path))
+        return created[-1]
+
+    monkeypatch.setattr(code.tempfile, "mkdtemp", mkdtemp)
+
+    with pytest.raises(Exception, match="Failed to clone repository"):
+        code.clone_repository(f"file://{tmp_path}/missing", "main", branch_exists=True)
+
+    assert len(created) == 1
+    assert not os.path.exists(created[0])
+
+
+def test_list_remote_refs_reads_dashed_url_as_repository(tmp_path):
+    """A URL that looks like an option is never run as one."""
+    marker = tmp_path / "marker"
+
+    assert code._list_remote_refs(f"--upload-pack=touch {marker}", "main") is None
+    assert not marker.exists()
+
+
+def test_analyze_repository_missing_branch_uses_default_branch(repo):
+    """The analysis of a branch the remote lacks is of its default branch."""
+    analysis = code.analyze_repository(f"file://{repo}", "missing")
+
+    assert analysis.startswith("\nRepository Analysis:")
+    assert "print('hello')" in analysis
@@ -0,0 +1,153 @@
+"""Tests for the data transformation agent's format detection and transformers."""
+
+import csv
+import json
+import math
+import xml.etree.ElementTree as ET
+from io import StringIO
+
+import pytest
+import yaml
+
+from a2a_agents.agents import data_transformation as dt
+
+# Inputs json.loads accepts, including those orjson rejects or reads lossily
+JSON_INPUTS = [
+    '{"name": "John", "tags": ["a", "b"], "nested": {"x": null, "y": true}}',
+    '[1, 2.5, "three"]',
+    '{"big": 123456789012345678901234567890}',
+    '{"small": -9223372036854775809}',
+    '{"max": 18446744073709551615}',
+    '{"a": NaN}',
+    '{"n": 1e400}',
+    '[1, 2, Infinity]',
+    '  {"padded": "with whitespace"}\n',
+]
+
+
+@pytest.mark.parametrize("data", JSON_INPUTS)
+def test_json_detected_and_parsed_like_json_loads(data):
+    """JSON is detected and parsed exactly as json.loads would."""
+    assert dt.detect_data_format(data) == "JSON"
+    parsed = dt.clean_and_parse_data(data)
+    # repr, as NaN != NaN
+    assert repr(parsed) == repr(json.loads(data))
+
+
+@pytest.mark.parametrize("data, expected", [
+    ("name: John\nage: 30", {"name": "John", "age": 30}),
+    ("# comment\nkey: value", {"key": "value"}),
+    ("%YAML 1.1\n---\nkey: value", {"key": "value"}),
+    ("# comment\n%TAG !yaml! tag:yaml.org,2002:\n---\nkey: !yaml!str value", {"key": "value"}),
+    ("---\n- a: 1\n- a: 2", [{"a": 1}, {"a": 2}]),
+    ("{a: 1, b: 2}", {"a": 1, "b": 2}),
+    ("{'a': 1}", {"a": 1}),
+    ("[x: y]", [{"x": "y"}]),
+])
+def test_yaml_detected_and_parsed(data, expected):
+    """Block and flow YAML are detected, including flow collections that aren't JSON."""
+    assert dt.detect_data_format(data) == "YAML"
+    assert dt.clean_and_parse_data(data) == expected
+
+
+@pytest.mark.parametrize("data, expected_format", [
+    ("<root><a>1</a></root>", "XML"),
+    ("a,b\n1,2\n3,4", "CSV"),
+    ("a\tb\n1\t2", "TSV"),
+    ("just some text", "Unstructured Text"),
+    ("See https://example.com: it explains", "Unstructured Text"),
+    ("[not json", "Unstructured Text"),
+])
+def test_other_formats_detected(data, expected_format):
+    """XML, CSV, TSV and plain text are told apart."""
+    assert dt.detect_data_format(data) == expected_format
+
+
+def test_tabular_and_text_parsing():
+    """CSV and TSV parse to rows, anything else is wrapped as text."""
+    assert dt.clean_and_parse_data("a,b\n1,2\n3,4") == {
+        "data": [{"a": "1", "b": "2"}, {"a": "3", "b": "4"}],
+        "format": "tabular",
+    }
+    assert dt.clean_and_parse_data("a\tb\n1\t2") == {
+        "data": [{"a": "1", "b": "2"}],
+        "format": "tabular",
+    }
+    assert dt.clean_and_parse_data("<a>1</a>") == {
+        "content": "<a>1</a>", "format": "text", "detected_format": "XML",
+    }
+
+
+def test_large_data_bypasses_cache():
+    """Payloads over MAX_CACHED_DATA_CHARS are parsed the same way, uncached."""
+    data = json.dumps({"values": list(range(dt.MAX_CACHED_DATA_CHARS // 4))})
+
+    assert len(data) > dt.MAX_CACHED_DATA_CHARS
+    assert dt.detect_data_format(data) == "JSON"
+    assert dt.clean_and_parse_data(data) == json.loads(data)
+
+
+def test_clean_and_parse_data_result_is_independent_of_cache():
+    """Modifying a returned value doesn't change what later calls get."""
+    data = '{"items": [1, 2], "meta": {"count": 2}}'
+
+    first = dt.clean_and_parse_data(data)
+    first["items"].append(3)
+    first["meta"]["count"] = 3
+
+    assert dt.clean_and_parse_data(data) == {"items": [1, 2], "meta": {"count": 2}}
+
+
+@pytest.mark.parametrize("data", [
+    {"name": "Zoë", "values": [1, 2.5, None, True], "nested": {"deep": ["x"]}},
+    {"big": 123456789012345678901234567890},
+    {"a": math.nan, "b": [math.inf, -math.inf], "c": None},
+    [],
+])
+def test_transform_to_json_matches_json_dumps(data):
+    """JSON output is identical to json.dumps with indent=2, even where orjson differs."""
+    assert dt.transform_to_json(data) == json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def test_transform_to_csv_round_trips_tabular_data():
+    """Tabular data is written as one CSV row per record."""
+    data = dt.clean_and_parse_data('a,b\n1,"x, y"\n3,4')
+
+    rows = list(csv.DictReader(StringIO(dt.transform_to_csv(data))))
+
+    assert rows == [{"a": "1", "b": "x, y"}, {"a": "3", "b": "4"}]
+
+
+def test_transform_to_xml_escapes_values():
+    """Values with markup characters come back unchanged from the XML."""
+    data = {"rows": [{"name": "<b>", "n": 1}, {"name": "x&y", "n": 2}], "my key": "A & B"}
+
+    root = ET.fromstring(dt.transform_to_xml(data).encode("utf-8"))
+
+    assert [row.findtext("name") for row in root.findall("rows")] == ["<b>", "x&y"]
+    assert root.findtext("my_key") == "A & B"
+
+
+def test_transform_to_yaml_round_trips():
+    """YAML output loads back to the same data."""
+    data = {"name": "Zoë", "values": [1, 2.5, None], "nested": {"a": {"b": "c"}}}
+
+    assert yaml.safe_load(dt.transform_to_yaml(data)) == data
+
+
+def test_transform_to_markdown():
+    """Keys become headings, one level deeper for each level of nesting."""
+    data = {"title": "Report", "section": {"item": "value"}}
+
+    assert dt.transform_to_markdown(data) == (
+        "# title\n\nReport\n\n# section\n\n## item\n\nvalue\n"
+    )
+
+
+def test_transform_to_html_escapes_values():
+    """Keys and values are HTML-escaped."""
+    html = dt.transform_to_html({"<k>": "x & <script>"})
+
+    assert "<h1>&lt;k&gt;</h1>" in html
+    assert "<p>x &amp; &lt;script&gt;</p>" in html
+    assert "<script>" not in html
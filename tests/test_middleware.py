@@ -0,0 +1,119 @@
+"""Tests for the shared A2A app middleware and routes."""
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.models.test import TestModel
+from starlette.testclient import TestClient
+
+from a2a_agents.apps._factory import build_a2a_app
+from a2a_agents.apps.middleware import DOCS_CACHE_CONTROL
+
+AGENT_NAME = "Test Agent"
+
+
+@pytest.fixture
+def client():
+    """A test client for an app built like the deployed agents."""
+    app = build_a2a_app(Agent(TestModel()), AGENT_NAME, "http://testserver")
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_docs_title_and_heading_rewritten(client):
+    """The /docs page shows the agent name, with a matching content-length."""
+    response = client.get("/docs", headers={"accept-encoding": "identity"})
+
+    assert response.status_code == 200
+    assert f"<title>{AGENT_NAME}</title>" in response.text
+    assert f"<h1>🤖 {AGENT_NAME}</h1>" in response.text
+    assert "FastA2A Agent</title>" not in response.text
+    assert int(response.headers["content-length"]) == len(response.content)
+    assert response.headers["cache-control"] == DOCS_CACHE_CONTROL
+
+
+def test_docs_etag_is_weak_and_shared_by_encodings(client):
+    """The gzip and identity responses carry the same weak ETag."""
+    gzipped = client.get("/docs", headers={"accept-encoding": "gzip"})
+    identity = client.get("/docs", headers={"accept-encoding": "identity"})
+
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in identity.headers
+    assert gzipped.headers["etag"].startswith('W/"')
+    assert gzipped.headers["etag"] == identity.headers["etag"]
+    assert gzipped.headers["vary"] == identity.headers["vary"] == "Accept-Encoding"
+
+
+@pytest.mark.parametrize("if_none_match", ["{etag}", "{opaque}", '"other", {etag}', "*"])
+def test_docs_revalidation_returns_not_modified(client, if_none_match):
+    """A matching If-None-Match, weak or not, gets an empty 304."""
+    etag = client.get("/docs").headers["etag"]
+
+    response = client.get(
+        "/docs",
+        headers={"if-none-match": if_none_match.format(etag=etag, opaque=etag.removeprefix("W/"))},
+    )
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == DOCS_CACHE_CONTROL
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_docs_changed_etag_returns_page(client):
+    """A non-matching If-None-Match gets the full page."""
+    client.get("/docs")
+
+    response = client.get("/docs", headers={"if-none-match": '"other"'})
+
+    assert response.status_code == 200
+    assert f"<title>{AGENT_NAME}</title>" in response.text
+
+
+@pytest.mark.parametrize("first_request", ["GET", "HEAD"])
+def test_docs_head_describes_rewritten_page(client, first_request):
+    """HEAD /docs has the rewritten page's ETag and length, whichever came first."""
+    if first_request == "HEAD":
+        head = client.head("/docs")
+        get = client.get("/docs", headers={"accept-encoding": "identity"})
+    else:
+        get = client.get("/docs", headers={"accept-encoding": "identity"})
+        head = client.head("/docs")
+
+    assert head.status_code == 200
+    assert head.content == b""
+    assert head.headers["etag"] == get.headers["etag"]
+    assert head.headers["content-length"] == get.headers["content-length"]
+    assert head.headers["cache-control"] == DOCS_CACHE_CONTROL
+    assert head.headers["vary"] == "Accept-Encoding"
+
+
+@pytest.mark.parametrize("method", ["GET", "HEAD"])
+def test_root_redirects_to_docs(client, method):
+    """GET and HEAD of / redirect to /docs, with the docs' cache lifetime."""
+    response = client.request(method, "/", follow_redirects=False)
+
+    assert response.status_code == 307
+    assert response.headers["location"] == "/docs"
+    assert response.headers["cache-control"] == DOCS_CACHE_CONTROL
+
+
+def test_root_post_reaches_a2a_endpoint(client):
+    """POST / is the A2A JSON-RPC endpoint, not the redirect."""
+    response = client.post(
+        "/",
+        json={"jsonrpc": "2.0", "id": 1, "method": "tasks/get", "params": {"id": "missing"}},
+        follow_redirects=False,
+    )
+
+    assert response.status_code == 200
+    assert response.json()["error"]["message"] == "Task not found"
+
+
+def test_other_routes_pass_through(client):
+    """Routes other than /docs are served unchanged."""
+    response = client.get("/.well-known/agent.json")
+
+    assert response.status_code == 200
+    assert response.json()["name"] == AGENT_NAME
+    assert "etag" not in response.headers
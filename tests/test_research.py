@@ -0,0 +1,88 @@
+"""Tests for the research agent's search helpers."""
+
+import threading
+
+import pytest
+
+from a2a_agents.agents import research
+from a2a_agents.agents.research import SearchResult
+
+RESULT = [SearchResult("Title", "Body", "https://example.com")]
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    """Replace the DuckDuckGo call with per-backend behaviours.
+
+    Returns:
+        Tuple of (backend name to behaviour, list of backends queried). A
+        behaviour is "ok", "empty", "fail" or "slow" (blocks until released)
+    """
+    behaviours = {}
+    queried = []
+    release = threading.Event()
+
+    def search_backend(query, max_results, backend):
+        queried.append(backend)
+        behaviour = behaviours[backend]
+        if behaviour == "fail":
+            raise RuntimeError(f"{backend} rate limited")
+        if behaviour == "slow":
+            release.wait(5)
+        return [] if behaviour == "empty" else RESULT
+
+    monkeypatch.setattr(research, "_search_backend", search_backend)
+    monkeypatch.setattr(research, "SEARCH_HEDGE_DELAY", 0.05)
+    yield behaviours, queried
+    release.set()
+
+
+def test_healthy_first_backend_answers_alone(backends):
+    """The second backend isn't queried when the first answers in time."""
+    behaviours, queried = backends
+    behaviours.update(html="ok", lite="ok")
+
+    assert research._search_hedged("query", 5) == RESULT
+    assert queried == ["html"]
+
+
+@pytest.mark.parametrize("first", ["fail", "empty", "slow"])
+def test_second_backend_hedges_first(backends, first):
+    """The next backend is tried once the first fails, is empty or is slow."""
+    behaviours, queried = backends
+    behaviours.update(html=first, lite="ok")
+
+    assert research._search_hedged("query", 5) == RESULT
+    assert queried == ["html", "lite"]
+
+
+def test_no_results_from_any_backend(backends):
+    """Every backend failing or empty gives no results."""
+    behaviours, queried = backends
+    behaviours.update(html="fail", lite="empty")
+
+    assert research._search_hedged("query", 5) == []
+    assert queried == ["html", "lite"]
+
+
+def test_attempt_times_out(backends, monkeypatch):
+    """Backends that never answer time the attempt out."""
+    behaviours, _ = backends
+    behaviours.update(html="slow", lite="slow")
+    monkeypatch.setattr(research, "SEARCH_TIMEOUT", 0.2)
+
+    with pytest.raises(research.FuturesTimeoutError):
+        research._search_hedged("query", 5)
+
+
+@pytest.mark.parametrize("url, valid", [
+    ("https://example.com/page?q=1", True),
+    ("HTTP://EXAMPLE.COM", True),
+    ("ftp://example.com", False),
+    ("https://", False),
+    ("https://exa mple.com", False),
+    ("No URL", False),
+])
+def test_validate_url(url, valid):
+    """Only http(s) URLs with a host and no whitespace are valid sources."""
+    assert research.validate_url(url) is valid